@@ -0,0 +1,50 @@
+import numpy as np
+import argparse
+import random
+import time
+
+from models.utilities.liquidswap_sdk.constants import FEE_SCALE, FEE_PCT
+from models.utilities.liquidswap_sdk import amm
+
+
+def quote_loop(amounts: list, reserve_in: int, reserve_out: int) -> list:
+    quotes = []
+    for amount in amounts:
+        amount_in_after_fees = amount * (FEE_SCALE - FEE_PCT)
+        quotes.append(amount_in_after_fees * reserve_out // (reserve_in * FEE_SCALE + amount_in_after_fees))
+    return quotes
+
+
+def best_of(repeat: int, function) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized vs per-amount LiquidSwap quotes")
+    parser.add_argument("--amounts", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    amounts = [random.randint(400000, 500000) for _ in range(args.amounts)]
+    amounts_array = np.array(amounts, dtype=np.uint64)
+    # (reserve_in, reserve_out): a USDC/APT sized pool takes the uint64 path, a wide one falls back to python integers
+    pools = {"usdc/apt": (2 * 10 ** 12, 3 * 10 ** 13), "wide": (10 ** 20, 10 ** 20)}
+
+    print(f"{'pool':>8} | {'loop us/quote':>13} | {'numpy us/quote':>14} | speedup")
+    for name, (reserve_in, reserve_out) in pools.items():
+        expected, loop = best_of(args.repeat, lambda: quote_loop(amounts, reserve_in, reserve_out))
+        quotes, vectorized = best_of(args.repeat, lambda: amm.quote(amounts_array, reserve_in, reserve_out))
+
+        assert [int(amount) for amount in quotes.amount_out] == expected
+        print(f"{name:>8} | {loop / len(amounts) * 1e6:>13.3f} | {vectorized / len(amounts) * 1e6:>14.3f} | "
+              f"{loop / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
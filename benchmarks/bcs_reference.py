@@ -0,0 +1,71 @@
+import hashlib
+
+# Reference encoder for benchmarks/signing_messages.py: the signing message of a JSON submission body, written from
+# the Aptos BCS layout without aptos_sdk so it does not share code with models.aptos_transactions. It knows only the
+# entry functions this bot calls and struct type arguments.
+
+RAW_TRANSACTION_PREFIX = hashlib.sha3_256(b"APTOS::RawTransaction").digest()
+ENTRY_FUNCTION_PAYLOAD = 2
+STRUCT_TYPE_TAG = 7
+
+# Move parameter types of the entry functions, by function name
+PARAMETERS = {
+    "claim_coin": [],
+    "swap": ["u64", "u64"],
+    "send_coin_from": ["u64", "vector<u8>", "u64", "u64", "u64", "bool", "vector<u8>", "vector<u8>"],
+}
+
+
+def uleb128(value: int) -> bytes:
+    encoded = b""
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if not value:
+            return encoded + bytes([byte])
+        encoded += bytes([byte | 0x80])
+
+
+def string(value: str) -> bytes:
+    encoded = value.encode()
+    return uleb128(len(encoded)) + encoded
+
+
+def address(value: str) -> bytes:
+    return bytes.fromhex(value[2:].rjust(64, "0"))
+
+
+def u64(value) -> bytes:
+    return int(value).to_bytes(8, "little")
+
+
+def struct_tag(value: str) -> bytes:
+    module_address, module, name = value.split("::")
+    return bytes([STRUCT_TYPE_TAG]) + address(module_address) + string(module) + string(name) + uleb128(0)
+
+
+def argument(kind: str, value) -> bytes:
+    if kind == "u64":
+        return u64(value)
+    if kind == "bool":
+        return b"\x01" if value else b"\x00"
+
+    raw = bytes.fromhex(value[2:])
+    return uleb128(len(raw)) + raw
+
+
+def signing_message(submission: dict, chain_id: int) -> str:
+    """Hex signing message of an encode_submission body, what the node's endpoint answers"""
+    payload = submission["payload"]
+    module_address, module, function = payload["function"].split("::")
+    arguments = [argument(kind, value) for kind, value in zip(PARAMETERS[function], payload["arguments"])]
+
+    encoded_payload = (uleb128(ENTRY_FUNCTION_PAYLOAD) + address(module_address) + string(module) + string(function)
+                       + uleb128(len(payload["type_arguments"]))
+                       + b"".join(struct_tag(type_argument) for type_argument in payload["type_arguments"])
+                       + uleb128(len(arguments)) + b"".join(uleb128(len(value)) + value for value in arguments))
+    raw_transaction = (address(submission["sender"]) + u64(submission["sequence_number"]) + encoded_payload
+                       + u64(submission["max_gas_amount"]) + u64(submission["gas_unit_price"])
+                       + u64(submission["expiration_timestamp_secs"]) + bytes([chain_id]))
+
+    return "0x" + (RAW_TRANSACTION_PREFIX + raw_transaction).hex()
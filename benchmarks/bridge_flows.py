@@ -0,0 +1,98 @@
+from loguru import logger
+import argparse
+import tempfile
+import time
+import sys
+import os
+
+from benchmarks.mock_nodes import Chain, Faults, EvmNode, AptosNode, GasApi, MockServer
+from models import useful_data, engine, deposits, jobs, claims
+from models.metrics import metrics
+from models.profiling import tracer
+
+FLOWS = {"1": "usdc_to_aptos + claim", "2": "liquidswap + bridge back"}
+
+
+def make_accounts(count: int) -> tuple:
+    evm_privates = ["0x" + os.urandom(32).hex() for _ in range(count)]
+    aptos_privates = ["0x" + os.urandom(32).hex() for _ in range(count)]
+    return evm_privates, aptos_privates
+
+
+def run_flow(chain: Chain, action: str, accounts: int, threads: int, data_dir: str) -> tuple:
+    # Every run gets its own job store so no account resumes from the previous one
+    jobs.job_store.close()
+    jobs.job_store.path = os.path.join(data_dir, f"jobs-{action}-{accounts}.sqlite3")
+    claims.claim_index.path = os.path.join(data_dir, f"claims-{action}-{accounts}.json")
+    claims.claim_index.accounts = None
+
+    calls_before = chain.calls.copy()
+    started = time.perf_counter()
+    engine.Engine(*make_accounts(accounts), threads).run(action)
+    elapsed = time.perf_counter() - started
+    claims.claim_index.save()
+
+    return elapsed, chain.calls - calls_before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bridge flows against local stand-in EVM and Aptos nodes")
+    parser.add_argument("--accounts", default="1,10,100", help="comma separated account counts, up to 10000")
+    parser.add_argument("--flows", default="1,2")
+    parser.add_argument("--threads", type=int, default=None, help="defaults to threads from config.ini")
+    parser.add_argument("--latency", type=float, default=20, help="per request latency of every node, ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--block-time", type=float, default=1.0, help="EVM block time, s")
+    parser.add_argument("--delivery", type=float, default=3.0, help="LayerZero delivery time to Aptos, s")
+    parser.add_argument("--calls", action="store_true", help="print the call count of every method")
+    parser.add_argument("--metrics", default=None, help="write the client side metrics to this .prom or .json file")
+    parser.add_argument("--profile", default=None, help="write a Chrome trace of the account stages to this file")
+    parser.add_argument("--cpu", action="store_true", help="with --profile, also write a cProfile next to the trace")
+    args = parser.parse_args()
+    if args.cpu and not args.profile:
+        parser.error("--cpu needs --profile")
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    chain = Chain(block_time=args.block_time, delivery=args.delivery)
+    faults = Faults(args.latency / 1000, args.error_rate)
+    servers = [MockServer(node(chain, faults)).start() for node in (EvmNode, AptosNode, GasApi)]
+    evm, aptos, gas_api = (server.url for server in servers)
+    useful_data.override_endpoints(evm=evm, aptos=f"{aptos}/v1", gas_api=f"{gas_api}/v4")
+
+    # Delivery takes seconds here instead of minutes on mainnet
+    deposits.MIN_POLL_INTERVAL = 0.5
+    deposits.MAX_POLL_INTERVAL = 1
+
+    threads = args.threads or useful_data.Data().threads
+    if args.profile:
+        tracer.start(cpu=args.cpu)
+    print(f"latency {args.latency:.0f} ms, error rate {args.error_rate:.1%}, {threads} threads")
+    print(f"{'flow':<26} | {'accounts':>8} | {'seconds':>8} | {'accounts/s':>10} | {'calls':>7} | calls/account")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        for action in args.flows.split(","):
+            for accounts in map(int, args.accounts.split(",")):
+                elapsed, calls = run_flow(chain, action, accounts, threads, data_dir)
+                total = sum(calls.values())
+                print(f"{FLOWS[action]:<26} | {accounts:>8} | {elapsed:>8.2f} | {accounts / elapsed:>10.2f} | "
+                      f"{total:>7} | {total / accounts:.1f}")
+
+                if args.calls:
+                    for (node, method), count in sorted(calls.items()):
+                        print(f"{'':<26}   {node:>8}   {method:<44} {count:>7}")
+
+        jobs.job_store.close()
+
+    if args.metrics:
+        metrics.export(args.metrics)
+    if args.profile:
+        tracer.write(args.profile)
+
+    for server in servers:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
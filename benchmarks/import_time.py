@@ -0,0 +1,69 @@
+import subprocess
+import argparse
+import time
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a run imports before it can do anything, measured in a fresh interpreter each time
+TARGETS = {
+    "menu (import main)": "import main",
+    "key derivation worker": "import models.keyring",
+    "action 1 (engine)": "import models.engine",
+    "action 2 (engine + liquidswap)": "import models.engine, models.utilities.liquidswap_sdk.client",
+}
+
+
+def run(statement: str, *options) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *options, "-c", statement], cwd=ROOT, check=True,
+                          capture_output=True, text=True)
+
+
+def best_of(statement: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(statement)
+        best = min(best, time.perf_counter() - started)
+
+    return best
+
+
+def heaviest(statement: str, count: int) -> list:
+    """(cumulative µs, module) of the slowest top-level packages, from -X importtime"""
+    packages = {}
+    for line in run(statement, "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        # Nested imports are indented, only the outermost import of a package holds its whole cost
+        depth = len(name) - len(name.lstrip())
+        if package not in packages or depth < packages[package][0]:
+            packages[package] = depth, int(cumulative)
+
+    return sorted(((cumulative, package) for package, (_, cumulative) in packages.items()), reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interpreter start up plus import time of the entry points")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the slowest packages of every target")
+    args = parser.parse_args()
+
+    interpreter = best_of("pass", args.repeat)
+    print(f"bare interpreter {interpreter * 1000:.0f} ms, best of {args.repeat}")
+    print(f"{'target':<32} | {'ms':>6} | {'imports ms':>10}")
+
+    for label, statement in TARGETS.items():
+        elapsed = best_of(statement, args.repeat)
+        print(f"{label:<32} | {elapsed * 1000:>6.0f} | {(elapsed - interpreter) * 1000:>10.0f}")
+
+        for cumulative, package in heaviest(statement, args.top):
+            print(f"{'':<32}   {cumulative / 1000:>6.0f}   {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import time
+import os
+
+from models.keyring import Keyring
+
+
+def make_mnemonics(count: int) -> list:
+    return [" ".join(f"word{index}x{position}" for position in range(12)) for index in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aptos key derivation throughput by process count")
+    parser.add_argument("--accounts", type=int, default=2000)
+    args = parser.parse_args()
+
+    mnemonics = make_mnemonics(args.accounts)
+    cpu_count = os.cpu_count() or 1
+    process_counts = sorted({1, *(2 ** power for power in range(cpu_count.bit_length()) if 2 ** power <= cpu_count),
+                             cpu_count})
+
+    baseline = None
+    print(f"{'processes':>9} | {'seconds':>8} | {'keys/s':>9} | speedup")
+    for processes in process_counts:
+        started = time.perf_counter()
+        Keyring().derive_batch(mnemonics, processes=processes)
+        elapsed = time.perf_counter() - started
+
+        baseline = baseline or elapsed
+        print(f"{processes:>9} | {elapsed:>8.2f} | {len(mnemonics) / elapsed:>9.0f} | {baseline / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
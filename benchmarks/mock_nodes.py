@@ -0,0 +1,384 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from collections import Counter
+from eth_account import Account
+from eth_abi import encode, decode
+from web3 import Web3
+import threading
+import hashlib
+import random
+import json
+import time
+import rlp
+
+from models import aptos_transactions
+
+BALANCE_OF = "0x70a08231"
+ALLOWANCE = "0xdd62ed3e"
+QUOTE_FOR_SEND = "0x468b9668"
+AGGREGATE3 = "0x82ad56cb"
+SEND_TO_APTOS = "0x76a9099a"
+
+USDC_BALANCE = 5 * 10 ** 6
+NATIVE_FEE = 10 ** 15
+APT_BALANCE = 10 ** 8
+LZ_AIRDROP = 10 ** 6
+BRIDGE_ADDRESS = aptos_transactions.BRIDGE_MODULE.split("::")[0]
+
+
+def normalize(address: str) -> str:
+    return hex(int(address, 16))
+
+
+class Faults:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0):
+        self.latency = latency
+        self.error_rate = error_rate
+
+    def inject(self) -> bool:
+        """Sleep for the configured latency, True when this request should fail"""
+        if self.latency:
+            time.sleep(self.latency)
+        return random.random() < self.error_rate
+
+
+class Chain:
+    """State shared by the stand-in nodes, a bridge sent on the EVM node is delivered on the Aptos node"""
+
+    def __init__(self, block_time: float = 1.0, delivery: float = 5.0, commit_time: float = 0.5):
+        self.block_time = block_time
+        self.delivery = delivery
+        self.commit_time = commit_time
+        self.started = time.monotonic()
+
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        # EVM
+        self.nonces = Counter()
+        self.mined = {}
+        # Aptos
+        self.sequence_numbers = Counter()
+        self.transactions = {}
+        self.account_transactions = {}
+        self.deliveries = []
+
+    def count(self, node: str, method: str):
+        with self.lock:
+            self.calls[(node, method)] += 1
+
+    def block(self) -> int:
+        return int((time.monotonic() - self.started) / self.block_time) + 1000
+
+    def delivered(self) -> list:
+        now = time.monotonic()
+        with self.lock:
+            return [receiver for receiver, deliver_at in self.deliveries if deliver_at <= now]
+
+
+class EvmNode:
+    name = "evm"
+
+    def __init__(self, chain: Chain, faults: Faults):
+        self.chain = chain
+        self.faults = faults
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple:
+        if self.faults.inject():
+            self.chain.count(self.name, "http 503")
+            return 503, {}, b"unavailable"
+
+        request = json.loads(body)
+        if isinstance(request, list):
+            response = [self.call(item) for item in request]
+        else:
+            response = self.call(request)
+
+        return 200, {"Content-Type": "application/json"}, json.dumps(response).encode()
+
+    def call(self, request: dict) -> dict:
+        self.chain.count(self.name, request["method"])
+        try:
+            result = getattr(self, request["method"])(*request.get("params", []))
+            return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+        except AttributeError:
+            return {"jsonrpc": "2.0", "id": request["id"],
+                    "error": {"code": -32601, "message": f"method {request['method']} not supported"}}
+
+    @staticmethod
+    def eth_chainId():
+        return hex(137)
+
+    def eth_blockNumber(self):
+        return hex(self.chain.block())
+
+    def eth_getBlockByNumber(self, block, full=False):
+        number = self.chain.block()
+        return {"number": hex(number), "hash": "0x" + f"{number:064x}", "baseFeePerGas": hex(30 * 10 ** 9),
+                "timestamp": hex(int(time.time())), "transactions": []}
+
+    @staticmethod
+    def eth_getBalance(address, block="latest"):
+        return hex(10 ** 18)
+
+    @staticmethod
+    def eth_estimateGas(transaction, block=None):
+        return hex(150000)
+
+    @staticmethod
+    def eth_maxPriorityFeePerGas():
+        return hex(2 * 10 ** 9)
+
+    @staticmethod
+    def eth_gasPrice():
+        return hex(32 * 10 ** 9)
+
+    def eth_feeHistory(self, count, block, percentiles):
+        count = int(count, 16) if isinstance(count, str) else count
+        return {"oldestBlock": hex(self.chain.block() - count), "baseFeePerGas": [hex(30 * 10 ** 9)] * (count + 1),
+                "gasUsedRatio": [0.5] * count, "reward": [[hex(2 * 10 ** 9)]] * count}
+
+    def eth_getTransactionCount(self, address, block="latest"):
+        with self.chain.lock:
+            return hex(self.chain.nonces[address.lower()])
+
+    def eth_call(self, transaction, block="latest"):
+        data = transaction.get("data") or transaction.get("input")
+        return "0x" + self.contract_call(Web3.to_bytes(hexstr=data)).hex()
+
+    def contract_call(self, data: bytes) -> bytes:
+        selector = "0x" + data[:4].hex()
+        if selector == BALANCE_OF:
+            return encode(["uint256"], [USDC_BALANCE])
+        if selector == ALLOWANCE:
+            return encode(["uint256"], [0])
+        if selector == QUOTE_FOR_SEND:
+            return encode(["uint256", "uint256"], [NATIVE_FEE, 0])
+        if selector == AGGREGATE3:
+            calls, = decode(["(address,bool,bytes)[]"], data[4:])
+            return encode(["(bool,bytes)[]"], [[(True, self.contract_call(call_data)) for _, _, call_data in calls]])
+
+        return encode(["uint256"], [0])
+
+    def eth_sendRawTransaction(self, raw):
+        raw = Web3.to_bytes(hexstr=raw)
+        tx_hash = Web3.keccak(raw).hex()
+        sender = Account.recover_transaction(raw).lower()
+        # EIP-1559: [chain id, nonce, priority fee, max fee, gas, to, value, data, access list, v, r, s]
+        fields = rlp.decode(raw[1:])
+        nonce, data = int.from_bytes(fields[1], "big"), fields[7]
+
+        with self.chain.lock:
+            self.chain.nonces[sender] = max(self.chain.nonces[sender], nonce + 1)
+            self.chain.mined[tx_hash] = (self.chain.block() + 1, sender, Web3.to_hex(fields[5]))
+            if "0x" + data[:4].hex() == SEND_TO_APTOS:
+                receiver = normalize(data[36:68].hex())
+                self.chain.deliveries.append((receiver, time.monotonic() + self.chain.delivery))
+
+        return tx_hash
+
+    def eth_getTransactionReceipt(self, tx_hash):
+        with self.chain.lock:
+            mined = self.chain.mined.get(tx_hash)
+        if mined is None or mined[0] > self.chain.block():
+            return None
+
+        block, sender, to = mined
+        return {
+            "transactionHash": tx_hash, "transactionIndex": "0x0", "blockNumber": hex(block),
+            "blockHash": "0x" + f"{block:064x}", "from": sender, "to": to, "contractAddress": None,
+            "cumulativeGasUsed": hex(150000), "gasUsed": hex(150000), "effectiveGasPrice": hex(32 * 10 ** 9),
+            "logs": [], "logsBloom": "0x" + "00" * 256, "status": "0x1", "type": "0x2",
+        }
+
+
+class AptosNode:
+    name = "aptos"
+
+    def __init__(self, chain: Chain, faults: Faults):
+        self.chain = chain
+        self.faults = faults
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple:
+        parsed = urlsplit(path)
+        segments = [unquote(segment) for segment in parsed.path.split("/") if segment][1:]  # drop the /v1 prefix
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        route, handler = self.route(method, segments)
+        self.chain.count(self.name, route)
+        if self.faults.inject():
+            return 503, {}, b"unavailable"
+
+        status, payload = handler(segments, query, body) if handler else (404, {"message": "not found"})
+        headers = {"Content-Type": "application/json", "X-Aptos-Ledger-Version": str(self.chain.block()),
+                   "X-Aptos-Ledger-TimestampUsec": str(int(time.time() * 1e6))}
+        return status, headers, json.dumps(payload).encode()
+
+    def route(self, method: str, segments: list) -> tuple:
+        """(route label, handler) from the path segments after /v1"""
+        shape = [method, *segments]
+        if len(segments) > 1 and segments[0] == "accounts":
+            shape[2] = ":address"
+        # (method, fixed segments) -> (label, handler, number of trailing path parameters)
+        routes = {
+            ("GET",): ("GET /", self.get_ledger, 0),
+            ("GET", "estimate_gas_price"): ("GET /estimate_gas_price", self.get_estimate_gas_price, 0),
+            ("GET", "accounts", ":address"): ("GET /accounts/:address", self.get_account, 0),
+            ("GET", "accounts", ":address", "resource"): ("GET /accounts/:address/resource/:type",
+                                                          self.get_resource, 1),
+            ("GET", "accounts", ":address", "transactions"): ("GET /accounts/:address/transactions",
+                                                              self.get_account_transactions, 0),
+            ("GET", "accounts", ":address", "events"): ("GET /accounts/:address/events/:handle/:field",
+                                                        self.get_events, 2),
+            ("GET", "transactions", "by_hash"): ("GET /transactions/by_hash/:hash", self.get_transaction, 1),
+            ("POST", "transactions"): ("POST /transactions", self.post_transaction, 0),
+            ("POST", "transactions", "simulate"): ("POST /transactions/simulate", self.post_simulate, 0),
+        }
+        for key, (label, handler, parameters) in routes.items():
+            if tuple(shape[:len(key)]) == key and len(shape) == len(key) + parameters:
+                return label, handler
+
+        return f"{method} unknown", None
+
+    def get_ledger(self, segments, query, body):
+        return 200, {"chain_id": 1, "ledger_version": str(self.chain.block())}
+
+    @staticmethod
+    def get_estimate_gas_price(segments, query, body):
+        return 200, {"gas_estimate": 100}
+
+    def get_account(self, segments, query, body):
+        address = normalize(segments[1])
+        with self.chain.lock:
+            return 200, {"sequence_number": str(self.chain.sequence_numbers[address]), "authentication_key": address}
+
+    def get_resource(self, segments, query, body):
+        address, resource_type = normalize(segments[1]), segments[3]
+        if resource_type == "0x1::coin::CoinStore<0x1::aptos_coin::AptosCoin>":
+            airdrop = LZ_AIRDROP if address in self.chain.delivered() else 0
+            return 200, {"type": resource_type, "data": {"coin": {"value": str(APT_BALANCE + airdrop)}}}
+        if resource_type == f"0x1::coin::CoinStore<{aptos_transactions.USDC}>":
+            return 200, {"type": resource_type, "data": {"coin": {"value": str(2 * 10 ** 6)}}}
+        if resource_type.startswith("0x1::coin::CoinInfo<"):
+            return 200, {"type": resource_type, "data": {"decimals": 6 if "USDC" in resource_type else 8}}
+        if "::liquidity_pool::LiquidityPool<" in resource_type:
+            x_is_usdc = resource_type.index("USDC") < resource_type.index("AptosCoin")
+            usdc, apt = 2 * 10 ** 12, 3 * 10 ** 13
+            return 200, {"type": resource_type, "data": {"coin_x_reserve": {"value": str(usdc if x_is_usdc else apt)},
+                                                         "coin_y_reserve": {"value": str(apt if x_is_usdc else usdc)}}}
+
+        return 404, {"message": "Resource not found", "error_code": "resource_not_found"}
+
+    def get_account_transactions(self, segments, query, body):
+        start, limit = int(query.get("start", 0)), int(query.get("limit", 25))
+        with self.chain.lock:
+            transactions = self.chain.account_transactions.get(normalize(segments[1]), [])
+            return 200, transactions[start:start + limit]
+
+    def get_events(self, segments, query, body):
+        events = [{"sequence_number": str(index), "type": f"{BRIDGE_ADDRESS}::coin_bridge::ReceiveEvent",
+                   "data": {"receiver": receiver, "amount_ld": "1000000", "stashed": True}}
+                  for index, receiver in enumerate(self.chain.delivered())]
+        limit = int(query.get("limit", 25))
+        if "start" not in query:
+            return 200, events[-limit:]
+
+        start = int(query["start"])
+        return 200, events[start:start + limit]
+
+    def get_transaction(self, segments, query, body):
+        with self.chain.lock:
+            transaction = self.chain.transactions.get(segments[2])
+        if transaction is None:
+            return 404, {"message": "Transaction not found", "error_code": "transaction_not_found"}
+        if transaction["committed_at"] > time.monotonic():
+            return 200, {"type": "pending_transaction", "hash": transaction["hash"]}
+
+        return 200, {key: value for key, value in transaction.items() if key != "committed_at"}
+
+    @staticmethod
+    def post_simulate(segments, query, body):
+        return 200, [{"gas_used": "600", "success": True, "vm_status": "Executed successfully"}]
+
+    def post_transaction(self, segments, query, body):
+        # BCS signed transaction: sender address, then the u64 sequence number
+        sender = normalize(body[:32].hex())
+        sequence_number = int.from_bytes(body[32:40], "little")
+        tx_hash = "0x" + hashlib.sha3_256(body).hexdigest()
+        function = f"{BRIDGE_ADDRESS}::coin_bridge::claim_coin" if b"claim_coin" in body else "0x1::other::call"
+        transaction = {"type": "user_transaction", "hash": tx_hash, "sender": sender,
+                       "sequence_number": str(sequence_number), "success": True,
+                       "vm_status": "Executed successfully", "payload": {"function": function},
+                       "committed_at": time.monotonic() + self.chain.commit_time}
+
+        with self.chain.lock:
+            if sequence_number < self.chain.sequence_numbers[sender]:
+                return 400, {"message": "Invalid transaction: SEQUENCE_NUMBER_TOO_OLD"}
+            self.chain.sequence_numbers[sender] = sequence_number + 1
+            self.chain.transactions[tx_hash] = transaction
+            self.chain.account_transactions.setdefault(sender, []).append(
+                {key: value for key, value in transaction.items() if key != "committed_at"})
+
+        return 202, {"hash": tx_hash}
+
+
+class GasApi:
+    name = "gas_api"
+
+    def __init__(self, chain: Chain, faults: Faults):
+        self.chain = chain
+        self.faults = faults
+
+    def handle(self, method: str, path: str, body: bytes) -> tuple:
+        self.chain.count(self.name, "GET /:network/gas")
+        if self.faults.inject():
+            return 503, {}, b"unavailable"
+
+        speeds = [{"maxFeePerGas": 31.0, "maxPriorityFeePerGas": 1.5}, {"maxFeePerGas": 35.0, "maxPriorityFeePerGas": 2.0}]
+        return 200, {"Content-Type": "application/json"}, json.dumps({"speeds": speeds}).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond("GET")
+
+    def do_POST(self):
+        self.respond("POST")
+
+    def respond(self, method: str):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            status, headers, payload = self.server.node.handle(method, self.path, body)
+        except Exception as err:
+            status, headers, payload = 500, {}, str(err).encode()
+
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer:
+    def __init__(self, node):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.server.node = node
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "MockServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,132 @@
+import argparse
+import json
+import time
+
+from models.transport import transport
+from models.keyring import keyring
+from models import aptos_transactions, useful_data
+from benchmarks import bcs_reference
+
+MNEMONIC = "abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon abandon about"
+EVM_ADDRESS = "0x1111111111111111111111111111111111111111"
+
+# Pinned so encodings recorded from a node keep matching
+SEQUENCE_NUMBER = 7
+GAS_UNIT_PRICE = 100
+MAX_GAS_AMOUNT = 1234
+EXPIRATION = 1700000000
+
+
+def cases() -> list:
+    """(BCS payload, the JSON payload the old encode path submitted for the same call)"""
+    receiver = "0x000000000000000000000000" + EVM_ADDRESS.replace("0x", "")
+    return [
+        (aptos_transactions.claim_coin_payload(), {
+            'function': f"{aptos_transactions.BRIDGE_MODULE}::claim_coin",
+            'type_arguments': [aptos_transactions.USDC],
+            'arguments': [],
+            'type': 'entry_function_payload'
+        }),
+        (aptos_transactions.swap_payload(450000, 1230000), {
+            'function': f"{aptos_transactions.SCRIPTS_MODULE}::swap",
+            'type_arguments': [aptos_transactions.USDC, aptos_transactions.APTOS_COIN,
+                               aptos_transactions.CURVE_UNCORRELATED],
+            'arguments': ["450000", "1230000"],
+            'type': 'entry_function_payload'
+        }),
+        (aptos_transactions.send_coin_from_payload(109, bytes.fromhex(receiver[2:]), 2000000, 4357489, 0, False,
+                                                   bytes.fromhex("000100000000000249f0"), b""), {
+            'function': f"{aptos_transactions.BRIDGE_MODULE}::send_coin_from",
+            'type_arguments': [aptos_transactions.USDC],
+            'arguments': ["109", receiver, "2000000", "4357489", "0", False, "0x000100000000000249f0", "0x"],
+            'type': 'entry_function_payload'
+        }),
+    ]
+
+
+def transactions() -> list:
+    """(raw transaction, the JSON body the old path sent to encode_submission) of every case"""
+    account = keyring.get_account(MNEMONIC)
+    builder = aptos_transactions.AptosTransactionBuilder(account)
+
+    built = []
+    for payload, json_payload in cases():
+        raw_transaction = builder.build(payload, SEQUENCE_NUMBER, GAS_UNIT_PRICE, max_gas_amount=MAX_GAS_AMOUNT)
+        raw_transaction.expiration_timestamps_secs = EXPIRATION
+        built.append((raw_transaction, {
+            "sender": str(account.address()),
+            "sequence_number": str(raw_transaction.sequence_number),
+            "max_gas_amount": str(raw_transaction.max_gas_amount),
+            "gas_unit_price": str(raw_transaction.gas_unit_price),
+            "expiration_timestamp_secs": str(raw_transaction.expiration_timestamps_secs),
+            "payload": json_payload,
+        }))
+
+    return built
+
+
+def encode_submission(txn_dict: dict) -> tuple:
+    """(signing message the node encodes for `txn_dict`, seconds the call took)"""
+    node_url = useful_data.Data().constants["aptos"]["APTOS_NODE_URLS"][-1]
+    started = time.perf_counter()
+    encoded = transport.post(f"{node_url}/transactions/encode_submission", json=txn_dict).json()
+    return encoded, time.perf_counter() - started
+
+
+def record(path: str):
+    recorded = [{"submission": txn_dict, "encoded": encode_submission(txn_dict)[0]}
+                for _, txn_dict in transactions()]
+    with open(path, "w") as f:
+        json.dump(recorded, f, indent=2)
+        f.write("\n")
+    print(f"Recorded {len(recorded)} node encodings to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local signing messages against an independent encoding of the JSON "
+                                                 "bodies the old path submitted")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--online", action="store_true", help="compare with the node's encode_submission")
+    source.add_argument("--recorded", metavar="PATH", help="compare with node encodings saved by --record")
+    source.add_argument("--record", metavar="PATH", help="save the node's encode_submission answers to PATH")
+    args = parser.parse_args()
+
+    if args.record:
+        return record(args.record)
+
+    recorded = []
+    if args.recorded:
+        with open(args.recorded) as f:
+            recorded = json.load(f)
+
+    chain_id = useful_data.Data().constants["aptos"]["CHAIN_ID"]
+    failed = 0
+    for index, (raw_transaction, txn_dict) in enumerate(transactions()):
+        started = time.perf_counter()
+        if args.online:
+            encoded, reference = encode_submission(txn_dict)[0], "node"
+        elif args.recorded:
+            if recorded[index]["submission"] != txn_dict:
+                raise ValueError(f"Case {index} differs from the recorded submission, record it again")
+            encoded, reference = recorded[index]["encoded"], "recorded node"
+        else:
+            # Offline, bcs_reference stands in for the node and shares no code with the builder
+            encoded, reference = bcs_reference.signing_message(txn_dict, chain_id), "reference"
+        reference_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        signing_message = raw_transaction.keyed()
+        local_time = time.perf_counter() - started
+
+        matches = aptos_transactions.signing_message_matches(raw_transaction, encoded)
+        failed += not matches
+        print(f"{txn_dict['payload']['function'].split('::')[-1]:>15} | identical to {reference}: {matches} | "
+              f"{reference} {reference_time * 1000:.1f} ms | local {local_time * 1000:.3f} ms | "
+              f"{len(signing_message)} bytes")
+
+    if failed:
+        raise SystemExit(f"{failed} signing messages differ")
+
+
+if __name__ == "__main__":
+    main()
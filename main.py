@@ -1,39 +1,52 @@
 from loguru import logger
-from time import sleep
 import urllib3
+import argparse
 import sys
 
-from models import aptos_bridge
+from models import useful_data
+from models.metrics import metrics
+from models.profiling import tracer
+from models.utilities import reader
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", nargs="?", const="data/profile.json", default=None, metavar="TRACE",
+                        help="write timing spans of every account's stages as a Chrome trace (default %(const)s)")
+    parser.add_argument("--cpu", action="store_true",
+                        help="with --profile, also write a cProfile of the CPU time next to the trace")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the last run: skip finished steps and wait on its sent transactions")
+    args = parser.parse_args()
+    if args.cpu and not args.profile:
+        parser.error("--cpu needs --profile")
+
     urllib3.disable_warnings()
     logger.remove()
     logger.add(sys.stdout, colorize=True,
                format="   <light-cyan>{time:HH:mm:ss}</light-cyan> | <level> {level: <8}</level> | - <white>{"
                       "message}</white>")
 
-    with open("data/evm_private_keys.txt", "r") as f:
-        evm_privates = [line.strip() for line in f]
-    with open("data/aptos_mnemonic.txt", "r") as f:
-        aptos_privates = [line.strip() for line in f]
+    data = useful_data.Data()
+    metrics.start(data.metrics_path, data.metrics_interval)
+
+    evm_privates = reader.read_file("data/evm_private_keys.txt", "EVM private keys", data.accounts_range)
+    aptos_privates = reader.read_file("data/aptos_mnemonic.txt", "Aptos mnemonics", data.accounts_range)
 
     action = input("Your choice: \n1) Swap to Aptos + claim\n2) LiquidSwap + swap from aptos\n\n>> ")
-    instance = aptos_bridge.AptosBridge(evm_privates[0], aptos_privates[0])
-
-    match action:
-        case "1":
-            # Swap and claim
-            success = instance.usdc_to_aptos()
-            if success:
-                sleep(15)
-                instance.claim_on_aptos()
-
-        case "2":
-            # Swap and claim
-            instance.liquid_swap_usdc_to_aptos()
-            sleep(30)
-            instance.usdc_from_aptos()
+
+    # The engine pulls in web3 and the Aptos SDK, loaded once the menu is answered instead of before it shows
+    from models import engine
+
+    if args.profile:
+        tracer.start(cpu=args.cpu)
+
+    try:
+        with tracer.account("main"):
+            engine.Engine(evm_privates, aptos_privates, data.threads).run(action, args.resume)
+    finally:
+        if args.profile:
+            tracer.write(args.profile)
 
 
 if __name__ == "__main__":
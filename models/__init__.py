@@ -1 +1,13 @@
-from . import aptos_bridge, useful_data, modules
+import importlib
+
+__all__ = ["aptos_bridge", "useful_data", "modules", "engine", "keyring", "rpc", "balances", "contracts",
+           "confirmations", "nonces", "gas", "aptos_transactions", "transport", "aptos_node", "metrics", "profiling",
+           "jobs", "claims", "deposits", "pipeline", "aptos_confirmations", "watchers"]
+
+
+def __getattr__(name: str):
+    # Submodules load on first use so a run only imports the SDKs of its action (PEP 562)
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,31 @@
 from random import uniform, randint, random, choice
-from aptc import Account, new_client
 from loguru import logger
 from web3 import Web3
 import time
 
-from .utilities.liquidswap_sdk.client import LiquidSwapClient
-from .utilities import reader
+from .confirmations import confirmation_watchers
+from .aptos_confirmations import aptos_watcher
+from .aptos_node import aptos_node
+from .claims import claim_index
+from .deposits import deposit_detector
+from .jobs import job_store
+from .contracts import contract_registry
+from .gas import gas_oracles, gas_estimates
+from .nonces import nonce_manager
+from .profiling import tracer
+from .transport import transport
+from . import aptos_transactions
+from . import jobs
 from . import useful_data
 from . import modules
+from . import rpc
+
+# step -> log messages of a finished Aptos transaction
+APTOS_OUTCOMES = {
+    "claim_on_aptos": ("Claimed on Aptos", "Failed to claim tokens on Aptos"),
+    "liquid_swap_usdc_to_aptos": ("Swapped USDC to APT on LiquidSwap", "Failed to swap USDC to APT on LiquidSwap"),
+    "usdc_from_aptos": ("Bridged USDC from Aptos", "Failed to bridge USDC from Aptos"),
+}
 
 
 class AptosBridge:
@@ -29,59 +47,78 @@ class AptosBridge:
         # Last balance on aptos
         self.current_aptos_balance = int
 
-    def usdc_to_aptos(self) -> bool:
+    def usdc_to_aptos(self, source: tuple = None, wait: bool = True):
+        """Bridge USDC from the source network, with `wait=False` the hash of the sent bridge transaction is returned
+        for the caller to await and pass to `finish_usdc_to_aptos`"""
         try:
+            job = job_store.get(self.evm_address, "usdc_to_aptos")
+            if job is not None and job.status == jobs.DONE:
+                logger.info(f"{self.evm_address} | USDC already bridged to Aptos -> {job.tx_hash}")
+                return True
+            if job is not None and job.status == jobs.SENT:
+                return self.resume_usdc_to_aptos(job, wait)
+
             try:
                 self.current_aptos_balance = self.aptos.get_account_balance()
             except:
                 self.current_aptos_balance = 0
 
-            self.network_to_swap, amount_usdc_to_send = self.evm.get_maximum_balance_network(self.evm_address)
+            if source is None:
+                source = self.evm.get_maximum_balance_network(self.evm_address)
+            self.network_to_swap, amount_usdc_to_send, scanned_allowance = source
 
             logger.info(f"Sending {amount_usdc_to_send / 1000000} USDC from {self.network_to_swap} to Aptos...")
 
-            w3 = self.evm.get_web3_instance(self.data.constants["networks"][self.network_to_swap]["urls"])
+            w3 = self.evm.get_web3_instance(self.network_to_swap)
 
-            usdc_contract = w3.eth.contract(address=self.data.constants["usdc_contracts"][self.network_to_swap],
-                                            abi=reader.read_abi("usdc_abi.json"))
-            aptos_bridge_contract = w3.eth.contract(
-                address=self.data.constants["aptos_bridge_contracts"][self.network_to_swap],
-                abi=reader.read_abi("aptos_abi.json"))
+            usdc_contract = contract_registry.get(self.network_to_swap,
+                                                  self.data.constants["usdc_contracts"][self.network_to_swap],
+                                                  "usdc_abi.json")
+            aptos_bridge_contract = contract_registry.get(
+                self.network_to_swap,
+                self.data.constants["aptos_bridge_contracts"][self.network_to_swap],
+                "aptos_abi.json")
 
             adapter_params = self.evm.create_adapter_params(self.network_to_swap, self.aptos_address)
 
-            fee, native_balance = self.evm.get_fee(aptos_bridge_contract, w3,
-                                                   (self.evm_address, "0x0000000000000000000000000000000000000000"),
-                                                   adapter_params)
+            with tracer.span("fee_quote"):
+                fee, native_balance = self.evm.get_fee(aptos_bridge_contract, w3,
+                                                       (self.evm_address, "0x0000000000000000000000000000000000000000"),
+                                                       adapter_params)
 
             underpriced_retry = False
             retries = 3
             delay = randint(20, 40)
 
             for attempt in range(retries):
+                # Set once the bridge transaction may have reached a node
+                broadcast = False
                 try:
 
-                    nonce = w3.eth.get_transaction_count(self.evm_address)
-                    max_fee_per_gas, max_priority_fee_per_gas = self.evm.get_gas_data(self.network_to_swap)
+                    with tracer.span("gas_price"):
+                        max_fee_per_gas, max_priority_fee_per_gas = self.evm.get_gas_data(self.network_to_swap)
 
                     if underpriced_retry:
                         max_fee_per_gas *= 1.15 + 0.05 * random()
                         max_priority_fee_per_gas *= 1.15 + 0.05 * random()
 
-                    # Check allowance
-                    allowance = self.evm.get_allowance(usdc_contract,
-                                                       self.evm_address,
-                                                       self.data.constants["aptos_bridge_contracts"][
-                                                           self.network_to_swap])
+                    # Check allowance, the balance scan read it already for the first attempt
+                    allowance = scanned_allowance
+                    if attempt > 0 or allowance is None:
+                        allowance = self.evm.get_allowance(usdc_contract, self.evm_address,
+                                                           self.data.constants["aptos_bridge_contracts"][
+                                                               self.network_to_swap])
+                    approve_txn_hash = None
                     if allowance < amount_usdc_to_send:
-                        self.evm.approve_and_retry(self.evm.account, amount_usdc_to_send, nonce, max_fee_per_gas,
-                                                   max_priority_fee_per_gas, w3,
-                                                   self.network_to_swap,
-                                                   usdc_contract,
-                                                   self.data.constants["aptos_bridge_contracts"][self.network_to_swap],
-                                                   self.data.constants["networks"][self.network_to_swap]["tx"])
-
-                        nonce = w3.eth.get_transaction_count(self.evm_address)
+                        # Approve is broadcast right before the bridge transaction, both are awaited afterwards
+                        with tracer.span("approve"):
+                            approve_txn_hash = self.evm.approve_usdc(
+                                self.evm.account, usdc_contract,
+                                self.data.constants["aptos_bridge_contracts"][self.network_to_swap],
+                                amount_usdc_to_send, nonce_manager.next(self.network_to_swap, self.evm_address),
+                                max_fee_per_gas, max_priority_fee_per_gas, w3)
+                        logger.info(
+                            f"Sent USDC approve transaction {self.data.constants['networks'][self.network_to_swap]['tx']}{approve_txn_hash.hex()}")
 
                     # Send tokens
                     swap_txn_obj = aptos_bridge_contract.functions.sendToAptos(
@@ -91,12 +128,16 @@ class AptosBridge:
                         (self.evm_address, "0x0000000000000000000000000000000000000000"),
                         adapter_params
                     )
-                    swap_gas_estimate = swap_txn_obj.estimate_gas({'from': self.evm_address, 'value': fee})
-                    # Multiply swap_gas_estimate by a random number between 1.01 to 1.04
-                    swap_gas_estimate = int(swap_gas_estimate * uniform(1.0301, 1.0402))
+                    if approve_txn_hash is None:
+                        swap_gas_estimate = swap_txn_obj.estimate_gas({'from': self.evm_address, 'value': fee})
+                        # Multiply swap_gas_estimate by a random number between 1.01 to 1.04
+                        swap_gas_estimate = int(swap_gas_estimate * uniform(1.0301, 1.0402))
 
-                    if self.network_to_swap == "Polygon":
-                        swap_gas_estimate = int(swap_gas_estimate * uniform(0.69090, 0.703))
+                        if self.network_to_swap == "Polygon":
+                            swap_gas_estimate = int(swap_gas_estimate * uniform(0.69090, 0.703))
+                    else:
+                        # The estimate reverts until the approve is mined
+                        swap_gas_estimate = self.data.constants["bridge_gas_limits"][self.network_to_swap]
 
                     swap_txn = swap_txn_obj.build_transaction({
                         'from': self.evm_address,
@@ -104,46 +145,54 @@ class AptosBridge:
                         'gas': swap_gas_estimate,
                         'maxFeePerGas': int(w3.to_wei(max_fee_per_gas, 'gwei')),
                         'maxPriorityFeePerGas': int(w3.to_wei(max_priority_fee_per_gas, 'gwei')),
-                        'nonce': nonce,
+                        'nonce': nonce_manager.next(self.network_to_swap, self.evm_address),
                     })
 
-                    signed_swap_txn = w3.eth.account.sign_transaction(swap_txn, self.evm_private)
-                    swap_txn_hash = w3.eth.send_raw_transaction(signed_swap_txn.rawTransaction)
+                    with tracer.span("sign"):
+                        signed_swap_txn = w3.eth.account.sign_transaction(swap_txn, self.evm_private)
+                    # Recorded before the broadcast, a crash in between leaves a transaction to rebroadcast
+                    job_store.start(self.evm_address, "usdc_to_aptos", self.network_to_swap, swap_txn['nonce'],
+                                    bytes(signed_swap_txn.rawTransaction), tx_hash=signed_swap_txn.hash.hex(),
+                                    extra={"aptos_balance": self.current_aptos_balance})
+                    broadcast = True
+                    with tracer.span("send"):
+                        try:
+                            swap_txn_hash = rpc.send_raw_transaction(w3, signed_swap_txn)
+                        except Exception as err:
+                            # An error answer means the node refused it, a timeout or dropped connection does not
+                            broadcast = not rpc.is_rpc_error(err)
+                            raise
 
                     logger.info(
                         f"Transaction hash -> {self.data.constants['networks'][self.network_to_swap]['tx']}{swap_txn_hash.hex()}")
 
-                    while True:
-                        try:
-                            tx_info = w3.eth.get_transaction(swap_txn_hash)
-                            if tx_info is None or " not found" in str(tx_info):
-                                logger.error('Transaction not found')
-                                time.sleep(5)
-                            else:
-                                receipt = w3.eth.get_transaction_receipt(swap_txn_hash)
-
-                                if receipt is None:
-                                    logger.info('Transaction not confirmed yet')
-                                    time.sleep(5)
-
-                                elif receipt['status'] == 1:
-                                    logger.success(
-                                        f"{self.network_to_swap} | SWAP SUCCEEDED -> {self.data.constants['networks'][self.network_to_swap]['tx']}{swap_txn_hash.hex()}")
-                                    return True
-
-                                else:
-                                    logger.error(
-                                        f"Transaction failed -> {self.data.constants['networks'][self.network_to_swap]['tx']}{swap_txn_hash.hex()}")
-                                    break
-                        except Exception as e:
-                            if " not found." in str(e):
-                                logger.error('Transaction not found')
-                                time.sleep(5)
-                            else:
-                                logger.error(f'Error: {e}')
+                    if approve_txn_hash is not None:
+                        # Only logged, the bridge transaction cannot be mined before the approve with the lower nonce
+                        confirmation_watchers.get(self.network_to_swap).watch(
+                            approve_txn_hash, lambda receipt: self.approve_mined(approve_txn_hash, receipt))
+
+                    if not wait:
+                        return swap_txn_hash.hex()
+
+                    with tracer.span("wait_confirmation", category="wait"):
+                        receipt = confirmation_watchers.get(self.network_to_swap).wait(swap_txn_hash)
+                    return self.finish_usdc_to_aptos(swap_txn_hash.hex(), receipt)
 
                 except Exception as e:
-                    if "execution reverted: LayerZero: not enough native for fees" in str(e):
+                    if broadcast:
+                        # The saved transaction may be in a mempool, wait on it instead of sending another bridge
+                        logger.warning(f"{self.network_to_swap} | Bridge transaction sent but not confirmed, "
+                                       f"resuming it -> {e}")
+                        return self.resume_usdc_to_aptos(job_store.get(self.evm_address, "usdc_to_aptos"), wait)
+
+                    job_store.save(self.evm_address, "usdc_to_aptos", jobs.FAILED)
+                    # Any failed broadcast may leave a gap in the locally allocated nonces
+                    nonce_manager.resync(self.network_to_swap, self.evm_address)
+
+                    if nonce_manager.is_nonce_error(e) and attempt < retries - 1:
+                        logger.warning(f"Retrying 'usdc to aptos' function (attempt {attempt + 1}/{retries}) due to "
+                                       f"nonce error -> {e}")
+                    elif "execution reverted: LayerZero: not enough native for fees" in str(e):
                         if attempt < retries - 1:
                             logger.warning(
                                 f"Retrying 'usdc to aptos' function (attempt {attempt + 1}/{retries}) due to error -> {e}")
@@ -160,148 +209,149 @@ class AptosBridge:
         except Exception as er:
             logger.error(f"Error while swapping USDC to Aptos -> {er}")
 
-    def claim_on_aptos(self):
+    def resume_usdc_to_aptos(self, job: jobs.Job, wait: bool = True):
+        self.network_to_swap = job.network
+        self.current_aptos_balance = job.extra.get("aptos_balance", int)
+        explorer = self.data.constants['networks'][job.network]['tx']
+        logger.info(f"{job.network} | Resuming bridge transaction -> {explorer}{job.tx_hash}")
+
         try:
-            client = new_client()
+            self.evm.get_web3_instance(job.network).eth.send_raw_transaction(job.raw_tx)
+        except Exception as err:
+            # already mined or still in the mempool
+            logger.debug(f"{job.network} | Rebroadcast of {job.tx_hash} rejected -> {err}")
+
+        if not wait:
+            return job.tx_hash
+
+        with tracer.span("wait_confirmation", category="wait"):
+            receipt = confirmation_watchers.get(job.network).wait(job.tx_hash)
+        return self.finish_usdc_to_aptos(job.tx_hash, receipt)
+
+    def approve_mined(self, tx_hash, receipt):
+        explorer = self.data.constants['networks'][self.network_to_swap]['tx']
+        if receipt is not None and receipt['status'] == 1:
+            logger.success(f"{self.network_to_swap} | USDC APPROVED {explorer}{tx_hash.hex()}")
+        else:
+            logger.error(f"USDC approve failed {explorer}{tx_hash.hex()}")
+
+    def finish_usdc_to_aptos(self, tx_hash: str, receipt) -> bool:
+        """Save the outcome of the bridge transaction, `receipt` is None when it was not mined in time"""
+        explorer = self.data.constants['networks'][self.network_to_swap]['tx']
+        if receipt is None:
+            # Still pending, the job stays SENT and the next run rebroadcasts and waits on this hash instead of
+            # sending a second bridge
+            nonce_manager.resync(self.network_to_swap, self.evm_address)
+            logger.error(f"Transaction not confirmed in time, left to resume -> {explorer}{tx_hash}")
+            return False
 
-            trans = client.account_transactions(self.aptos_address)
+        if receipt['status'] == 1:
+            job_store.save(self.evm_address, "usdc_to_aptos", jobs.DONE)
+            logger.success(f"{self.network_to_swap} | SWAP SUCCEEDED -> {explorer}{tx_hash}")
+            return True
 
-            for transaction in trans:
-                if "claim_coin" in str(transaction) and transaction["success"] is True:
-                    logger.success(f"Token already claimed!")
-                    return
+        job_store.save(self.evm_address, "usdc_to_aptos", jobs.FAILED)
+        logger.error(f"Transaction failed -> {explorer}{tx_hash}")
+        return False
 
-            while True:
-                try:
-                    balance = self.aptos.get_account_balance()
-                    if balance != self.current_aptos_balance:
-                        break
-                except:
-                    pass
-
-                time.sleep(randint(25, 35))
-
-            rand_sleep = randint(30, 120)
-            logger.info(f"Not claimed yet, waiting for {rand_sleep} seconds and start to claim.")
-            time.sleep(rand_sleep)
-
-            # Get gas price
-            import requests
-            r = requests.get("https://rpc.ankr.com/http/aptos/v1/estimate_gas_price",
-                             headers={"Accept": "application/json, application/x-bcs"}).json()
-
-            # submit transaction
-            # load your private key, environment variable
-            account = Account.load_key(self.aptos_private_key)
-            account_address = account.address()
-
-            # build a transaction payload
-            payload = {
-                'function': '0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::coin_bridge::claim_coin',
-                'type_arguments': ["0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC"],
-                'arguments': [],
-                'type': 'entry_function_payload'
-            }
-
-            txn_dict = {
-                "sender": f"{account_address}",
-                "sequence_number": str(client.get_account_sequence_number(account_address)),
-                "max_gas_amount": str(1000),
-                "gas_unit_price": str(r["gas_estimate"]),
-                "expiration_timestamp_secs": str(int(time.time()) + 100),
-                "payload": payload,
-                "signature": {
-                    "type": "ed25519_signature",
-                    "public_key": f"{account.public_key()}",
-                    "signature": f"{'0' * 128}",
-                }}
-
-            gas = int(self.aptos.get_gas_amount(txn_dict))
-            txn_dict["max_gas_amount"] = str(int(gas + (gas * 0.1)))
-
-            # encode this transaction
-            encoded = client.encode(txn_dict)
-            # sign this transaction
-            signature = account.sign(encoded)
-
-            txn_dict["signature"] = {
-                "type": "ed25519_signature",
-                "public_key": f"{account.public_key()}",
-                "signature": f"{signature}",
-            }
-
-            # submit transaction
-            tx = client.submit_transaction(txn_dict)
-
-            logger.success(f"Claimed on Aptos -> {tx['hash']}")
+    def claim_settled(self) -> bool:
+        """Whether the claim has nothing to wait for: sent by an earlier run or already on chain"""
+        job = job_store.get(self.aptos_address, "claim_on_aptos")
+        if job is not None and job.status in (jobs.DONE, jobs.SENT):
+            return True
+
+        return claim_index.is_claimed(self.aptos_address)
+
+    def deposit_baseline(self):
+        """APT balance before bridging, the deposit detector compares against it"""
+        if isinstance(self.current_aptos_balance, int):
+            return self.current_aptos_balance
+
+        bridge_job = job_store.get(self.evm_address, "usdc_to_aptos")
+        return bridge_job.extra.get("aptos_balance") if bridge_job is not None else None
+
+    def claim_on_aptos(self, wait_for_deposit: bool = True, wait: bool = True):
+        """Claim the bridged USDC, with `wait=False` the hash of the submitted claim is returned for the caller to
+        await"""
+        try:
+            job = job_store.get(self.aptos_address, "claim_on_aptos")
+            if job is not None and job.status == jobs.DONE:
+                logger.success(f"Token already claimed!")
+                return
+
+            if job is not None and job.status == jobs.SENT:
+                tx = self.resume_aptos_transaction(job, wait)
+            elif claim_index.is_claimed(self.aptos_address):
+                job_store.save(self.aptos_address, "claim_on_aptos", jobs.DONE)
+                logger.success(f"Token already claimed!")
+                return
+            else:
+                if wait_for_deposit:
+                    with tracer.span("wait_deposit", category="wait"):
+                        deposit = deposit_detector.wait(self.aptos_address, self.deposit_baseline())
+                    if deposit is None:
+                        logger.error(f"Bridged USDC has not arrived on Aptos in time, not claiming")
+                        return
+
+                logger.info(f"Bridged USDC arrived on Aptos, claiming...")
+
+                tx = self.submit_aptos_transaction(aptos_transactions.claim_coin_payload(), "claim_on_aptos", wait)
+            if not wait and "hash" in str(tx):
+                logger.info(f"Sent claim on Aptos -> {tx['hash']}")
+                return tx["hash"]
+            if "hash" in str(tx):
+                logger.success(f"Claimed on Aptos -> {tx['hash']}")
+            else:
+                logger.error(f"Failed to claim tokens on Aptos -> {tx['message']}")
 
         except Exception as err:
             logger.exception(f"Failed to claim tokens on Aptos -> {err}")
 
-    def liquid_swap_usdc_to_aptos(self):
+    def liquid_swap_usdc_to_aptos(self, wait: bool = True):
+        """Swap on LiquidSwap, with `wait=False` the hash of the submitted swap is returned for the caller to await"""
         try:
-            liquid_client = LiquidSwapClient(node_url="https://fullnode.mainnet.aptoslabs.com/v1",
+            job = job_store.get(self.aptos_address, "liquid_swap_usdc_to_aptos")
+            if job is not None and job.status == jobs.DONE:
+                logger.info(f"Already swapped USDC to APT on LiquidSwap -> {job.tx_hash}")
+                return
+            if job is not None and job.status == jobs.SENT:
+                tx = self.resume_aptos_transaction(job, wait)
+                if not wait and "hash" in str(tx):
+                    return tx["hash"]
+                if "hash" in str(tx):
+                    logger.success(f"Swapped USDC to APT on LiquidSwap -> {tx['hash']}")
+                else:
+                    logger.error(f"Failed to swap USDC to APT on LiquidSwap -> {tx['message']}")
+                return
+
+            # Only this flow needs the LiquidSwap SDK
+            from .utilities.liquidswap_sdk.client import LiquidSwapClient
+            from .utilities.liquidswap_sdk.reserves import reserves_snapshots
+
+            node_url = self.data.constants["LIQUIDSWAP_NODE_URL"]
+            reserves_snapshots.configure(self.data.reserves_interval, self.data.reserves_max_age)
+            liquid_client = LiquidSwapClient(node_url=node_url,
                                              tokens_mapping={
                                                  "APTOS": "0x1::aptos_coin::AptosCoin",
                                                  "USDC": "0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC",
                                              },
-                                             account=self.aptos.get_aptos_account())
-
-            minimum_aptos_to_get = round(liquid_client.calculate_rates("USDC", "APTOS", 0.5), 5)
-
-            client = new_client()
+                                             account=self.aptos.get_aptos_account(),
+                                             http_client=transport.client(node_url),
+                                             chain_id=self.data.constants["aptos"]["CHAIN_ID"],
+                                             coin_info_path="data/coin_info.json")
 
-            # Get gas price
-            import requests
-            r = requests.get("https://rpc.ankr.com/http/aptos/v1/estimate_gas_price",
-                             headers={"Accept": "application/json, application/x-bcs"}).json()
-
-            # submit transaction
-            # load your private key, environment variable
-            account = Account.load_key(self.aptos_private_key)
-            account_address = account.address()
+            with tracer.span("quote"):
+                minimum_aptos_to_get = round(liquid_client.calculate_rates("USDC", "APTOS", 0.5), 5)
 
             amount_to_send = randint(400000, 500000)
-            # build a transaction payload
-            payload = {
-                'function': '0x190d44266241744264b964a37b8f09863167a12d3e70cda39376cfb4e3561e12::scripts_v2::swap',
-                'type_arguments': ["0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC",
-                                   "0x1::aptos_coin::AptosCoin",
-                                   "0x190d44266241744264b964a37b8f09863167a12d3e70cda39376cfb4e3561e12::curves::Uncorrelated"],
-                'arguments': [
-                    str(amount_to_send),  # amount of usdc to swap
-                    str(int(minimum_aptos_to_get * 1000000))  # amount of usdc + 0.2% fee
-                ],
-                'type': 'entry_function_payload'
-            }
-
-            txn_dict = {"sender": str(account_address),
-                        "sequence_number": str(client.get_account_sequence_number(account_address)),
-                        "max_gas_amount": str(1000), "gas_unit_price": str(r["gas_estimate"]),
-                        "expiration_timestamp_secs": str(int(time.time()) + 100), "payload": payload, "signature": {
-                    "type": "ed25519_signature",
-                    "public_key": f"{account.public_key()}",
-                    "signature": f"{'0' * 128}",
-                }}
-
-            gas = int(self.aptos.get_gas_amount(txn_dict))
-
-            txn_dict["max_gas_amount"] = str(int(gas + (gas * 0.1)))
-
-            # encode this transaction
-            encoded = client.encode(txn_dict)
-            # sign this transaction
-            signature = account.sign(encoded)
-            # generate fake signature for transaction test
-
-            txn_dict["signature"] = {
-                "type": "ed25519_signature",
-                "public_key": f"{account.public_key()}",
-                "signature": f"{signature}",
-            }
-
-            # submit transaction
-            tx = client.submit_transaction(txn_dict)
+            tx = self.submit_aptos_transaction(aptos_transactions.swap_payload(
+                amount_to_send,  # amount of usdc to swap
+                int(minimum_aptos_to_get * 1000000)  # amount of usdc + 0.2% fee
+            ), "liquid_swap_usdc_to_aptos", wait)
+            if not wait and "hash" in str(tx):
+                logger.info(f"Sent swap of {amount_to_send / 1000_000} USDC to {minimum_aptos_to_get} APT on "
+                            f"LiquidSwap -> {tx['hash']}")
+                return tx["hash"]
             if "hash" in str(tx):
                 logger.success(
                     f"Swapped {amount_to_send / 1000_000} USDC to {minimum_aptos_to_get} APT on LiquidSwap -> {tx['hash']}")
@@ -311,12 +361,38 @@ class AptosBridge:
         except Exception as err:
             logger.error(f"Failed to swap USDC to APT on LiquidSwap -> {err}")
 
-    def usdc_from_aptos(self):
+    def finish_aptos_transaction(self, step: str, tx_hash: str, transaction) -> bool:
+        """Save and log the outcome of a transaction submitted with `wait=False`"""
+        tx = self.record_aptos_transaction(step, tx_hash, transaction)
+        succeeded, failed = APTOS_OUTCOMES[step]
+        if "hash" in str(tx):
+            logger.success(f"{succeeded} -> {tx['hash']}")
+            return True
+
+        logger.error(f"{failed} -> {tx['message']}")
+        return False
+
+    def usdc_from_aptos(self, wait: bool = True):
+        """Bridge the USDC on Aptos back, with `wait=False` the hash of the submitted transaction is returned for the
+        caller to await"""
         try:
+            job = job_store.get(self.aptos_address, "usdc_from_aptos")
+            if job is not None and job.status == jobs.DONE:
+                logger.info(f"USDC already bridged from Aptos -> {job.tx_hash}")
+                return
+            if job is not None and job.status == jobs.SENT:
+                tx = self.resume_aptos_transaction(job, wait)
+                if not wait and "hash" in str(tx):
+                    return tx["hash"]
+                if "hash" in str(tx):
+                    logger.success(f"Bridged USDC from Aptos -> {tx['hash']}")
+                else:
+                    logger.error(f"Failed to bridge USDC from Aptos -> {tx['message']}")
+                return
+
             destination_network = choice(["Polygon", "Avalanche"])
 
-            client = new_client()
-            usdc_balance_str = client.get_account_resource(self.aptos_address,
+            usdc_balance_str = aptos_node.get_account_resource(self.aptos_address,
                                                            "0x1::coin::CoinStore<0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC>")[
                 "data"]["coin"]["value"]
 
@@ -324,62 +400,21 @@ class AptosBridge:
                 logger.info(f"USDC balance is {int(usdc_balance_str) / 1000_000}, lower than expected.")
                 return
 
-            # Get gas price
-            import requests
-            r = requests.get("https://rpc.ankr.com/http/aptos/v1/estimate_gas_price",
-                             headers={"Accept": "application/json, application/x-bcs"}).json()
-
-            # submit transaction
-            account = Account.load_key(self.aptos_private_key)
-            account_address = account.address()
-
-            # build a transaction payload
-            payload = {
-                'function': '0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::coin_bridge::send_coin_from',
-                'type_arguments': ["0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC"],
-                'arguments': [
-                    str(self.data.constants["networks"][destination_network]["chain_id"]),
-                    "0x000000000000000000000000" + str(self.evm_address).replace("0x", ""),
-                    usdc_balance_str,
-                    str(randint(3357489, 5357489)),  # bridge fee
-                    "0",
-                    False,
-                    "0x000100000000000249f0",  # ???
-                    "0x",
-                ],
-                'type': 'entry_function_payload'
-            }
-
-            txn_dict = {"sender": str(account_address),
-                        "sequence_number": str(client.get_account_sequence_number(account_address)),
-                        "max_gas_amount": str(1000),
-                        "gas_unit_price": str(r["gas_estimate"]),
-                        "expiration_timestamp_secs": str(int(time.time()) + 100),
-                        "payload": payload, "signature": {
-                    "type": "ed25519_signature",
-                    "public_key": f"{account.public_key()}",
-                    "signature": f"{'0' * 128}",
-                }}
-
-            gas = int(self.aptos.get_gas_amount(txn_dict))
-
-            txn_dict["max_gas_amount"] = str(int(gas + (gas * 0.1)))
-
-            # encode this transaction
-            encoded = client.encode(txn_dict)
-            # sign this transaction
-            signature = account.sign(encoded)
-            # generate fake signature for transaction test
-
-            txn_dict["signature"] = {
-                "type": "ed25519_signature",
-                "public_key": f"{account.public_key()}",
-                "signature": f"{signature}",
-            }
-
-            # submit transaction
-            tx = client.submit_transaction(txn_dict)
-
+            tx = self.submit_aptos_transaction(aptos_transactions.send_coin_from_payload(
+                self.data.constants["networks"][destination_network]["chain_id"],
+                bytes.fromhex("000000000000000000000000" + str(self.evm_address).replace("0x", "")),
+                int(usdc_balance_str),
+                randint(3357489, 5357489),  # bridge fee
+                0,
+                False,
+                bytes.fromhex("000100000000000249f0"),  # ???
+                b"",
+            ), "usdc_from_aptos", wait)
+
+            if not wait and "hash" in str(tx):
+                logger.info(f"Sent {int(usdc_balance_str) / 1000_000} USDC from Aptos to {destination_network} -> "
+                            f"{tx['hash']}")
+                return tx["hash"]
             if "hash" in str(tx):
                 logger.success(
                     f"Bridged {int(usdc_balance_str) / 1000_000} USDC from Aptos to {destination_network} -> {tx['hash']}")
@@ -388,3 +423,82 @@ class AptosBridge:
 
         except Exception as err:
             logger.error(f"Failed to bridge USDC from Aptos -> {err}")
+
+    def submit_aptos_transaction(self, payload, step: str = None, wait: bool = True) -> dict:
+        """Submit `payload`, when it belongs to a job `step` the transaction is recorded and, unless `wait` is False,
+        awaited until committed"""
+        builder = self.aptos.get_transaction_builder()
+
+        # Get gas price
+        with tracer.span("gas_price"):
+            gas_unit_price = gas_oracles.get_aptos().get()
+
+        with tracer.span("build"):
+            raw_transaction = builder.build(payload, aptos_node.get_account_sequence_number(self.aptos_address),
+                                            gas_unit_price)
+
+        with tracer.span("simulate"):
+            raw_transaction.max_gas_amount = self.aptos.get_gas_amount(raw_transaction)
+
+        # sign and submit the BCS encoded transaction
+        with tracer.span("sign"):
+            signed_transaction = builder.sign(raw_transaction)
+        if step is not None:
+            # A new attempt clears the hash a failed one left, resuming must not wait on that
+            job_store.start(self.aptos_address, step, "Aptos", raw_transaction.sequence_number,
+                            signed_transaction.bytes())
+
+        with tracer.span("submit"):
+            tx = builder.submit(signed_transaction)
+        if "hash" not in str(tx):
+            gas_estimates.invalidate(aptos_transactions.estimate_key(raw_transaction))
+            if step is not None:
+                job_store.save(self.aptos_address, step, jobs.FAILED)
+            return tx
+
+        if step is not None:
+            job_store.save(self.aptos_address, step, jobs.SENT, tx_hash=tx["hash"])
+            if wait:
+                return self.wait_aptos_transaction(step, tx["hash"])
+
+        return tx
+
+    def resume_aptos_transaction(self, job: jobs.Job, wait: bool = True) -> dict:
+        tx_hash = job.tx_hash
+        if tx_hash is None:
+            # Crashed between signing and learning the hash, the node answers with it or rejects a used sequence number
+            tx = self.aptos.get_transaction_builder().submit(job.raw_tx)
+            if "hash" in str(tx):
+                tx_hash = tx["hash"]
+            else:
+                # A used sequence number means the saved transaction, or one replacing it, was committed
+                committed = aptos_node.account_transactions(self.aptos_address, start=job.nonce, limit=1)
+                if not committed:
+                    job_store.save(self.aptos_address, job.step, jobs.FAILED)
+                    return tx
+                tx_hash = committed[0]["hash"]
+            job_store.save(self.aptos_address, job.step, jobs.SENT, tx_hash=tx_hash)
+
+        logger.info(f"Resuming Aptos transaction -> {tx_hash}")
+        if not wait:
+            return {"hash": tx_hash}
+        return self.wait_aptos_transaction(job.step, tx_hash)
+
+    def wait_aptos_transaction(self, step: str, tx_hash: str) -> dict:
+        with tracer.span("wait_commit", category="wait"):
+            transaction = aptos_watcher.wait(tx_hash)
+        return self.record_aptos_transaction(step, tx_hash, transaction)
+
+    def record_aptos_transaction(self, step: str, tx_hash: str, tx) -> dict:
+        """Save the outcome of a committed transaction, `tx` is None when it was not committed in time"""
+        if tx is None:
+            return {"message": f"{tx_hash} not committed in time"}
+
+        if not tx.get("success"):
+            # e.g. OUT_OF_GAS, the cached estimate must not be handed to the next transaction
+            gas_estimates.invalidate(aptos_transactions.committed_estimate_key(tx))
+            job_store.save(self.aptos_address, step, jobs.FAILED)
+            return {"message": f"{tx_hash} failed -> {tx.get('vm_status')}"}
+
+        job_store.save(self.aptos_address, step, jobs.DONE)
+        return tx
@@ -0,0 +1,42 @@
+from loguru import logger
+
+from .aptos_node import aptos_node
+from .watchers import Watcher
+
+DEFAULT_TIMEOUT = 120
+POLL_INTERVAL = 1
+MAX_POLL_INTERVAL = 5
+
+
+class AptosTransactionWatcher(Watcher):
+    """One polling thread for every submitted Aptos transaction that is waiting to be committed"""
+
+    name = "aptos-confirmations"
+
+    def __init__(self):
+        super().__init__()
+        self.interval = POLL_INTERVAL
+
+    def watch(self, tx_hash: str, callback, timeout: float = DEFAULT_TIMEOUT):
+        """Call `callback(transaction)` once `tx_hash` is committed, or `callback(None)` after `timeout` seconds"""
+        self.add(tx_hash, callback, timeout)
+
+    def poll(self, hashes: list) -> float:
+        # A failing lookup only skips its own hash, the others still resolve in this pass
+        failed = False
+        for tx_hash in hashes:
+            try:
+                transaction = aptos_node.get_transaction(tx_hash)
+            except Exception as err:
+                logger.warning(f"Aptos | Failed to poll transaction {tx_hash} -> {err}")
+                failed = True
+                continue
+
+            if transaction is not None:
+                self.resolve(tx_hash, transaction)
+
+        self.interval = min(self.interval * 2, MAX_POLL_INTERVAL) if failed else POLL_INTERVAL
+        return self.interval
+
+
+aptos_watcher = AptosTransactionWatcher()
@@ -0,0 +1,84 @@
+from loguru import logger
+import httpx
+
+from .transport import transport
+from . import useful_data
+
+HEADERS = {"Accept": "application/json"}
+
+
+class NotFound(ValueError):
+    pass
+
+
+class AptosNode:
+    def __init__(self, node_urls: list = None):
+        self.node_urls = node_urls
+        # APT CoinStore resource type, read from the constants together with the node list
+        self.apt_coin_store = None
+
+    def load_constants(self):
+        constants = useful_data.Data().constants["aptos"]
+        if self.node_urls is None:
+            self.node_urls = constants["APTOS_NODE_URLS"]
+        self.apt_coin_store = constants["APTOS"]
+
+    def get_node_urls(self) -> list:
+        if self.node_urls is None:
+            self.load_constants()
+
+        return self.node_urls
+
+    def get(self, path: str, params: dict = None):
+        """GET `path` from the first node that answers, falls through to the next one on network errors and 5xx"""
+        last_error = None
+        for node_url in self.get_node_urls():
+            try:
+                response = transport.get(f"{node_url}{path}", params=params, headers=HEADERS)
+            except httpx.TransportError as err:
+                logger.warning(f"Aptos | Request to {node_url}{path} failed -> {err}")
+                last_error = err
+                continue
+
+            if response.status_code >= 500 or response.status_code == 429:
+                last_error = ValueError(f"{node_url}{path} -> {response.status_code} {response.text}")
+                continue
+            if response.status_code == 404:
+                raise NotFound(f"{path} -> {response.status_code} {response.text}")
+            if response.status_code >= 400:
+                raise ValueError(f"{path} -> {response.status_code} {response.text}")
+
+            return response.json()
+
+        raise last_error or ValueError("No Aptos nodes configured")
+
+    def get_account(self, address) -> dict:
+        return self.get(f"/accounts/{address}")
+
+    def get_account_sequence_number(self, address) -> int:
+        return int(self.get_account(address)["sequence_number"])
+
+    def get_account_resource(self, address, resource_type: str) -> dict:
+        return self.get(f"/accounts/{address}/resource/{resource_type}")
+
+    def get_account_balance(self, address) -> int:
+        if self.apt_coin_store is None:
+            self.load_constants()
+
+        return int(self.get_account_resource(address, self.apt_coin_store)["data"]["coin"]["value"])
+
+    def account_transactions(self, address, start: int = None, limit: int = None) -> list:
+        params = {key: value for key, value in (("start", start), ("limit", limit)) if value is not None}
+        return self.get(f"/accounts/{address}/transactions", params=params)
+
+    def get_transaction(self, tx_hash: str):
+        """Committed transaction, or None while it is pending or unknown to the node"""
+        try:
+            transaction = self.get(f"/transactions/by_hash/{tx_hash}")
+        except NotFound:
+            return None
+
+        return None if transaction.get("type") == "pending_transaction" else transaction
+
+
+aptos_node = AptosNode()
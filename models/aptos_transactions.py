@@ -0,0 +1,152 @@
+from aptos_sdk.authenticator import Authenticator, Ed25519Authenticator
+from aptos_sdk.transactions import (
+    EntryFunction,
+    RawTransaction,
+    SignedTransaction,
+    TransactionArgument,
+    TransactionPayload,
+)
+from aptos_sdk.account import Account as AptosAccount
+from aptos_sdk.type_tag import StructTag, TypeTag
+from aptos_sdk.bcs import Serializer
+from aptos_sdk import ed25519
+from loguru import logger
+import time
+import re
+
+from .transport import transport
+from . import useful_data
+
+BRIDGE_MODULE = "0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::coin_bridge"
+SCRIPTS_MODULE = "0x190d44266241744264b964a37b8f09863167a12d3e70cda39376cfb4e3561e12::scripts_v2"
+USDC = "0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC"
+APTOS_COIN = "0x1::aptos_coin::AptosCoin"
+CURVE_UNCORRELATED = "0x190d44266241744264b964a37b8f09863167a12d3e70cda39376cfb4e3561e12::curves::Uncorrelated"
+
+# aptos_sdk 0.5 renamed Serializer.bytes to Serializer.to_bytes
+SERIALIZE_BYTES = getattr(Serializer, "to_bytes", None) or Serializer.bytes
+
+# Nodes print addresses without leading zeros (0x1), aptos_sdk pads them to 32 bytes
+ADDRESS = re.compile(r"0x0*([0-9a-fA-F]+)")
+
+BCS_HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/x.aptos.signed_transaction+bcs",
+}
+
+
+def type_tag(struct: str) -> TypeTag:
+    return TypeTag(StructTag.from_str(struct))
+
+
+def claim_coin_payload() -> TransactionPayload:
+    return TransactionPayload(EntryFunction.natural(BRIDGE_MODULE, "claim_coin", [type_tag(USDC)], []))
+
+
+def swap_payload(amount_in: int, min_amount_out: int) -> TransactionPayload:
+    return TransactionPayload(EntryFunction.natural(
+        SCRIPTS_MODULE,
+        "swap",
+        [type_tag(USDC), type_tag(APTOS_COIN), type_tag(CURVE_UNCORRELATED)],
+        [
+            TransactionArgument(amount_in, Serializer.u64),
+            TransactionArgument(min_amount_out, Serializer.u64),
+        ],
+    ))
+
+
+def send_coin_from_payload(dst_chain_id: int, dst_receiver: bytes, amount: int, native_fee: int, zro_fee: int,
+                           unwrap: bool, adapter_params: bytes, msglib_params: bytes) -> TransactionPayload:
+    return TransactionPayload(EntryFunction.natural(
+        BRIDGE_MODULE,
+        "send_coin_from",
+        [type_tag(USDC)],
+        [
+            TransactionArgument(dst_chain_id, Serializer.u64),
+            TransactionArgument(dst_receiver, SERIALIZE_BYTES),
+            TransactionArgument(amount, Serializer.u64),
+            TransactionArgument(native_fee, Serializer.u64),
+            TransactionArgument(zro_fee, Serializer.u64),
+            TransactionArgument(unwrap, Serializer.bool),
+            TransactionArgument(adapter_params, SERIALIZE_BYTES),
+            TransactionArgument(msglib_params, SERIALIZE_BYTES),
+        ],
+    ))
+
+
+def short_addresses(name: str) -> str:
+    return ADDRESS.sub(lambda match: f"0x{match.group(1).lower()}", name)
+
+
+def estimate_key(raw_transaction: RawTransaction) -> tuple:
+    entry_function = raw_transaction.payload.value
+    return (short_addresses(f"{entry_function.module}::{entry_function.function}"),
+            tuple(short_addresses(str(ty_arg)) for ty_arg in entry_function.ty_args))
+
+
+def committed_estimate_key(transaction: dict) -> tuple:
+    """estimate_key of a transaction as the node returns it"""
+    payload = transaction.get("payload") or {}
+    return (short_addresses(payload.get("function", "")),
+            tuple(short_addresses(ty_arg) for ty_arg in payload.get("type_arguments", [])))
+
+
+def signing_message_matches(raw_transaction: RawTransaction, encoded) -> bool:
+    """Compare the local signing message with the one returned by the node's encode_submission endpoint"""
+    if isinstance(encoded, str):
+        encoded = bytes.fromhex(encoded[2:] if encoded.startswith("0x") else encoded)
+
+    return raw_transaction.keyed() == encoded
+
+
+class AptosTransactionBuilder:
+    def __init__(self, account: AptosAccount):
+        self.account = account
+        self.constants = useful_data.Data().constants["aptos"]
+
+    def build(self, payload: TransactionPayload, sequence_number: int, gas_unit_price: int,
+              max_gas_amount: int = 1000, ttl: int = 100) -> RawTransaction:
+        return RawTransaction(
+            self.account.address(),
+            sequence_number,
+            payload,
+            max_gas_amount,
+            gas_unit_price,
+            int(time.time()) + ttl,
+            self.constants["CHAIN_ID"],
+        )
+
+    def sign(self, raw_transaction: RawTransaction) -> SignedTransaction:
+        signature = self.account.sign(raw_transaction.keyed())
+        return SignedTransaction(raw_transaction,
+                                 Authenticator(Ed25519Authenticator(self.account.public_key(), signature)))
+
+    def simulate(self, raw_transaction: RawTransaction) -> int:
+        # The node refuses to simulate transactions carrying a valid signature
+        signed_transaction = SignedTransaction(raw_transaction, Authenticator(
+            Ed25519Authenticator(self.account.public_key(), ed25519.Signature(b"\x00" * 64))))
+
+        # The node raises the max gas amount for the simulation so a low default does not end it out of gas
+        result = self.post("/transactions/simulate?estimate_max_gas_amount=true", signed_transaction.bytes())[0]
+        if not result.get("success"):
+            raise ValueError(f"Simulation failed -> {result.get('vm_status')}")
+
+        return int(result["gas_used"])
+
+    def submit(self, signed_transaction) -> dict:
+        """Submit a signed transaction, or its BCS bytes saved by an earlier run"""
+        if isinstance(signed_transaction, SignedTransaction):
+            signed_transaction = signed_transaction.bytes()
+
+        return self.post("/transactions", signed_transaction)
+
+    def post(self, path: str, content: bytes):
+        last_error = None
+        for node_url in self.constants["APTOS_NODE_URLS"]:
+            try:
+                return transport.post(f"{node_url}{path}", headers=BCS_HEADERS, content=content).json()
+            except Exception as err:
+                logger.warning(f"Aptos | Request to {node_url}{path} failed -> {err}")
+                last_error = err
+
+        raise last_error or ValueError("No Aptos nodes configured")
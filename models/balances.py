@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from retrying import retry
+from loguru import logger
+
+from .contracts import contract_registry
+from .metrics import metrics
+from .profiling import tracer
+from . import useful_data
+from . import rpc
+
+
+# Extra multicalls for wallets whose balanceOf or allowance subcall failed
+SUBCALL_RETRIES = 2
+UNREADABLE = {"balance": None, "allowance": None}
+
+
+class BalanceScanner:
+    def __init__(self, networks: list = None, batch_size: int = 300):
+        self.data = useful_data.Data()
+        self.networks = networks or list(self.data.constants["usdc_contracts"])
+        self.batch_size = batch_size
+
+    def scan(self, wallets: list) -> dict:
+        """USDC balance and bridge allowance of every wallet, {wallet: {network: {"balance", "allowance"}}}, both
+        None where the read kept failing"""
+        stage, account = metrics.current_stage(), tracer.current_account()
+
+        def scan_network(network: str) -> dict:
+            with metrics.stage(stage), tracer.account(account):
+                try:
+                    return self.scan_network(network, wallets)
+                except Exception as err:
+                    # Wallets funded on the other networks still bridge
+                    logger.error(f"{network} | Failed to scan USDC balances -> {err}")
+                    return {wallet: dict(UNREADABLE) for wallet in wallets}
+
+        with ThreadPoolExecutor(max_workers=len(self.networks)) as executor:
+            results = dict(zip(self.networks, executor.map(scan_network, self.networks)))
+
+        return {wallet: {network: results[network][wallet] for network in self.networks} for wallet in wallets}
+
+    def scan_network(self, network: str, wallets: list) -> dict:
+        w3 = rpc.web3_registry.get(network)
+        usdc_address = self.data.constants["usdc_contracts"][network]
+        spender = self.data.constants["aptos_bridge_contracts"][network]
+
+        usdc_contract = contract_registry.get(network, usdc_address, "ERC20_ABI")
+        multicall = contract_registry.get(network, self.data.constants["multicall3"], "MULTICALL3_ABI")
+
+        results = {}
+        unreadable = 0
+        pending = list(wallets)
+        for _ in range(1 + SUBCALL_RETRIES):
+            failed = []
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+
+                calls = []
+                for wallet in batch:
+                    calls.append((usdc_address, True, usdc_contract.encodeABI(fn_name="balanceOf", args=[wallet])))
+                    calls.append((usdc_address, True, usdc_contract.encodeABI(fn_name="allowance",
+                                                                              args=[wallet, spender])))
+
+                try:
+                    returned = self.aggregate(multicall, calls)
+                except Exception as err:
+                    # aggregate already retried, the whole batch stays unread instead of retrying it again
+                    logger.warning(f"{network} | Failed to read the USDC balances of {len(batch)} wallets -> {err}")
+                    unreadable += len(batch)
+                    results.update((wallet, dict(UNREADABLE)) for wallet in batch)
+                    continue
+
+                for index, wallet in enumerate(batch):
+                    balance = self.decode_uint(w3, returned[2 * index])
+                    allowance = self.decode_uint(w3, returned[2 * index + 1])
+                    if balance is None or allowance is None:
+                        failed.append(wallet)
+                    results[wallet] = {"balance": balance, "allowance": allowance}
+
+            pending = failed
+            if not pending:
+                break
+
+        if pending or unreadable:
+            logger.warning(f"{network} | Failed to read the USDC balance of {len(pending) + unreadable} wallets")
+        logger.info(f"{network} | Scanned USDC balances of {len(wallets)} wallets")
+        return results
+
+    @staticmethod
+    @retry(stop_max_attempt_number=5, wait_fixed=2000, retry_on_exception=metrics.retrying("multicall_aggregate"))
+    def aggregate(multicall, calls: list) -> list:
+        return multicall.functions.aggregate3(calls).call()
+
+    @staticmethod
+    def decode_uint(w3, result):
+        """uint256 returned by a subcall, None when it failed"""
+        success, return_data = result
+        if not success or len(return_data) < 32:
+            return None
+
+        return w3.codec.decode(["uint256"], return_data)[0]
+
+    def pick_networks(self, wallets: list) -> dict:
+        """Network with the highest USDC balance for every wallet, (network, balance, allowance), False if it has
+        none, or None if a failed read leaves that open"""
+        picked = {}
+        for wallet, balances in self.scan(wallets).items():
+            known = [network for network in balances if balances[network]["balance"] is not None]
+            max_balance_network = max(known, key=lambda network: balances[network]["balance"], default=None)
+
+            if max_balance_network is not None and balances[max_balance_network]["balance"] >= 1:
+                picked[wallet] = (max_balance_network, balances[max_balance_network]["balance"],
+                                  balances[max_balance_network]["allowance"])
+            else:
+                picked[wallet] = False if len(known) == len(balances) else None
+
+        return picked
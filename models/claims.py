@@ -0,0 +1,95 @@
+from loguru import logger
+import threading
+import atexit
+import json
+import time
+import os
+
+from .aptos_node import aptos_node, NotFound
+
+# matched by suffix, nodes may print the module address in short or long form
+CLAIM_FUNCTION = "::coin_bridge::claim_coin"
+PAGE_SIZE = 100
+# Cursors are cheap to rebuild, so the file is rewritten at most this often, seconds, and at exit
+SAVE_INTERVAL = 5
+
+
+class ClaimIndex:
+    """Whether each Aptos account has claimed its bridged USDC, persisted with a cursor over the account's transactions"""
+
+    def __init__(self, path: str = "data/claim_index.json"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.accounts = None
+        self.dirty = False
+        self.saved_at = 0.0
+        atexit.register(self.save)
+
+    def load(self) -> dict:
+        with self.lock:
+            if self.accounts is None:
+                self.accounts = {}
+                if os.path.exists(self.path):
+                    with open(self.path, "r") as f:
+                        self.accounts = json.load(f)
+
+            return self.accounts
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+
+            # Replace the file in one step so a crash mid-write never leaves invalid JSON behind
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(self.accounts, f, indent=2)
+            os.replace(temporary, self.path)
+            self.dirty = False
+            self.saved_at = time.monotonic()
+
+    def update(self, address: str, cursor: int, claimed: bool):
+        accounts = self.load()
+        with self.lock:
+            accounts[address] = {"cursor": cursor, "claimed": claimed}
+            self.dirty = True
+            due = time.monotonic() - self.saved_at >= SAVE_INTERVAL
+
+        if due:
+            self.save()
+
+    @staticmethod
+    def is_claim(transaction: dict) -> bool:
+        return transaction.get("success") is True and \
+            transaction.get("payload", {}).get("function", "").endswith(CLAIM_FUNCTION)
+
+    def is_claimed(self, address: str) -> bool:
+        address = str(address)
+        state = self.load().get(address, {"cursor": 0, "claimed": False})
+        if state["claimed"]:
+            return True
+
+        try:
+            sequence_number = aptos_node.get_account_sequence_number(address)
+        except NotFound:
+            # the account does not exist on chain until it receives its first coins
+            return False
+
+        cursor, claimed = state["cursor"], False
+        # only transactions sent since the last check are fetched
+        while cursor < sequence_number and not claimed:
+            page = aptos_node.account_transactions(address, start=cursor, limit=PAGE_SIZE)
+            if not page:
+                break
+
+            claimed = any(self.is_claim(transaction) for transaction in page)
+            cursor = int(page[-1]["sequence_number"]) + 1
+
+        if cursor != state["cursor"] or claimed:
+            self.update(address, cursor, claimed)
+            logger.debug(f"{address} | Indexed claim status up to sequence number {cursor}")
+
+        return claimed
+
+
+claim_index = ClaimIndex()
@@ -0,0 +1,83 @@
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+from hexbytes import HexBytes
+from loguru import logger
+from web3 import Web3
+import threading
+
+from .watchers import Watcher
+from . import useful_data
+from . import rpc
+
+DEFAULT_TIMEOUT = 300
+MAX_POLL_INTERVAL = 15
+BATCH_SIZE = 100
+
+
+class ConfirmationWatcher(Watcher):
+    def __init__(self, network: str, block_time: float):
+        super().__init__()
+        self.name = f"{network}-confirmations"
+        self.network = network
+        self.w3 = rpc.web3_registry.get(network)
+        self.block_time = block_time
+
+        self.last_block = None
+        self.interval = block_time
+
+    def watch(self, tx_hash, callback, timeout: float = DEFAULT_TIMEOUT):
+        """Call `callback(receipt)` once `tx_hash` is mined, or `callback(None)` after `timeout` seconds"""
+        # hashes come as bytes from a send and as hex strings from the job store
+        self.add(Web3.to_hex(HexBytes(tx_hash)), callback, timeout)
+
+    def poll(self, hashes: list) -> float:
+        try:
+            block = self.w3.eth.block_number
+            if block != self.last_block:
+                self.last_block = block
+                self.interval = self.block_time
+                self.check(hashes)
+            else:
+                self.interval = min(self.interval * 1.5, MAX_POLL_INTERVAL)
+        except Exception as err:
+            logger.warning(f"{self.network} | Failed to poll transaction receipts -> {err}")
+            self.interval = min(self.interval * 2, MAX_POLL_INTERVAL)
+
+        return self.interval
+
+    def check(self, hashes: list):
+        for start in range(0, len(hashes), BATCH_SIZE):
+            batch = hashes[start:start + BATCH_SIZE]
+            for tx_hash, receipt in zip(batch, self.get_receipts(batch)):
+                if receipt is not None:
+                    self.resolve(tx_hash, receipt)
+
+    def get_receipts(self, hashes: list) -> list:
+        try:
+            responses = self.w3.provider.make_batch_request(
+                [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in hashes])
+        except Exception:
+            responses = [self.w3.provider.make_request("eth_getTransactionReceipt", [tx_hash]) for tx_hash in hashes]
+
+        return [AttributeDict(receipt_formatter(response["result"])) if response.get("result") else None
+                for response in responses]
+
+
+class ConfirmationWatchers:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.watchers = {}
+
+    def get(self, network: str) -> ConfirmationWatcher:
+        watcher = self.watchers.get(network)
+        if watcher is None:
+            with self.lock:
+                watcher = self.watchers.get(network)
+                if watcher is None:
+                    block_time = useful_data.Data().constants["networks"][network]["block_time"]
+                    watcher = self.watchers[network] = ConfirmationWatcher(network, block_time)
+
+        return watcher
+
+
+confirmation_watchers = ConfirmationWatchers()
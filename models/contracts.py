@@ -0,0 +1,35 @@
+import threading
+
+from .utilities import reader
+from . import useful_data
+from . import rpc
+
+
+class ContractRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.abis = {}
+        self.contracts = {}
+
+    def get_abi(self, abi_name: str) -> list:
+        """ABI from a json file next to the reader (`usdc_abi.json`) or from the constants (`ERC20_ABI`)"""
+        abi = self.abis.get(abi_name)
+        if abi is None:
+            abi = reader.read_abi(abi_name) if abi_name.endswith(".json") else useful_data.Data().constants[abi_name]
+            with self.lock:
+                abi = self.abis.setdefault(abi_name, abi)
+
+        return abi
+
+    def get(self, network: str, address: str, abi_name: str):
+        key = (network, address, abi_name)
+        contract = self.contracts.get(key)
+        if contract is None:
+            contract = rpc.web3_registry.get(network).eth.contract(address=address, abi=self.get_abi(abi_name))
+            with self.lock:
+                contract = self.contracts.setdefault(key, contract)
+
+        return contract
+
+
+contract_registry = ContractRegistry()
@@ -0,0 +1,143 @@
+from loguru import logger
+import time
+
+from .aptos_node import aptos_node, NotFound
+from .watchers import Watcher
+from . import aptos_transactions
+
+BRIDGE_ADDRESS = aptos_transactions.BRIDGE_MODULE.split("::")[0]
+RECEIVE_EVENTS = f"/accounts/{BRIDGE_ADDRESS}/events/{BRIDGE_ADDRESS}::coin_bridge::EventStore/receive_events"
+# LayerZero usually delivers to Aptos a couple of minutes after the source transaction is mined
+EXPECTED_DELIVERY = 120
+DEFAULT_TIMEOUT = 3600
+MIN_POLL_INTERVAL = 3
+MAX_POLL_INTERVAL = 30
+PAGE_SIZE = 100
+# How often accounts waiting past their expected arrival get their balance checked, seconds
+OVERDUE_CHECK_INTERVAL = 60
+
+
+def normalize(address) -> str:
+    return hex(int(str(address), 16))
+
+
+class DepositDetector(Watcher):
+    """Watches every pending Aptos address at once for bridged USDC, reading the bridge's receive events"""
+
+    name = "aptos-deposits"
+
+    def __init__(self):
+        super().__init__()
+        # next receive event to read, None until the stream head is known
+        self.cursor = None
+        self.overdue_check_at = 0.0
+
+    def watch(self, address, callback, baseline: int = None, eta: float = EXPECTED_DELIVERY,
+              timeout: float = DEFAULT_TIMEOUT):
+        """Call `callback(deposit)` once bridged coins reach `address`, or `callback(None)` after `timeout` seconds
+
+        `baseline` is the APT balance before bridging, the LayerZero airdrop changes it when coins arrive.
+        """
+        address = normalize(address)
+        if self.cursor is None:
+            head = self.head()
+            with self.lock:
+                if self.cursor is None:
+                    self.cursor = head
+
+        known_baseline = baseline is not None
+        if not known_baseline:
+            baseline = self.get_balance(address)
+
+        # context is (baseline APT balance, expected arrival). Registered before the balance check, so an event
+        # landing in between is either read by the poll thread or already shows in the balance
+        self.add(address, callback, timeout, (baseline, time.monotonic() + eta))
+
+        if known_baseline:
+            balance = self.get_balance(address)
+            if balance != baseline:
+                # delivered before the watch started, the event is already behind the stream head
+                self.resolve(address, {"receiver": address, "apt_balance": balance})
+
+    def poll(self, addresses: list) -> float:
+        try:
+            self.poll_events()
+        except Exception as err:
+            logger.warning(f"Aptos | Failed to read bridge receive events, checking balances -> {err}")
+            self.poll_balances(addresses)
+        else:
+            # A deposit the event stream missed still shows in the balance of an account waiting past its arrival
+            if time.monotonic() >= self.overdue_check_at:
+                self.overdue_check_at = time.monotonic() + OVERDUE_CHECK_INTERVAL
+                self.poll_balances(self.overdue())
+
+        return self.interval()
+
+    def overdue(self) -> list:
+        now = time.monotonic()
+        with self.lock:
+            return [address for address, waiters in self.pending.items()
+                    if any(waiter.context[1] < now for waiter in waiters)]
+
+    def sleep(self, interval: float):
+        # an account joining with an earlier expected arrival cuts the sleep short
+        self.wakeup.wait(interval)
+
+    def interval(self) -> float:
+        """Poll slowly until the earliest expected delivery, then every MIN_POLL_INTERVAL seconds"""
+        expected = [waiter.context[1] for waiter in self.waiters()]
+        if not expected:
+            return MAX_POLL_INTERVAL
+
+        return min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, min(expected) - time.monotonic()))
+
+    def head(self) -> int:
+        try:
+            events = aptos_node.get(RECEIVE_EVENTS, params={"limit": 1})
+        except Exception as err:
+            logger.warning(f"Aptos | Failed to read the bridge receive event stream head -> {err}")
+            return None
+
+        return int(events[-1]["sequence_number"]) + 1 if events else 0
+
+    def poll_events(self):
+        if self.cursor is None:
+            self.cursor = self.head()
+            if self.cursor is None:
+                raise ValueError("Receive event stream unavailable")
+
+        while True:
+            events = aptos_node.get(RECEIVE_EVENTS, params={"start": self.cursor, "limit": PAGE_SIZE})
+            for event in events:
+                receiver = event["data"].get("receiver")
+                if receiver is not None:
+                    self.resolve(normalize(receiver), event["data"])
+
+            if events:
+                self.cursor = int(events[-1]["sequence_number"]) + 1
+            if len(events) < PAGE_SIZE:
+                return
+
+    def poll_balances(self, addresses: list):
+        for address in addresses:
+            with self.lock:
+                waiters = list(self.pending.get(address, []))
+
+            try:
+                balance = self.get_balance(address)
+            except Exception as err:
+                logger.warning(f"{address} | Failed to check APT balance -> {err}")
+                continue
+
+            if any(balance != waiter.context[0] for waiter in waiters):
+                self.resolve(address, {"receiver": address, "apt_balance": balance})
+
+    @staticmethod
+    def get_balance(address: str) -> int:
+        try:
+            return aptos_node.get_account_balance(address)
+        except NotFound:
+            return 0
+
+
+deposit_detector = DepositDetector()
@@ -0,0 +1,135 @@
+from eth_account import Account
+from functools import partial
+from loguru import logger
+
+from .confirmations import confirmation_watchers
+from .aptos_confirmations import aptos_watcher
+from .deposits import deposit_detector
+from .pipeline import Pipeline, Stage
+from .keyring import keyring
+from .metrics import metrics
+from .profiling import tracer
+from .jobs import job_store
+from . import jobs
+from . import aptos_bridge
+from . import balances
+
+
+class Engine:
+    def __init__(self, evm_privates: list, aptos_privates: list, threads: int):
+        if len(evm_privates) != len(aptos_privates):
+            logger.warning(f"Loaded {len(evm_privates)} EVM keys and {len(aptos_privates)} Aptos mnemonics, "
+                           f"only {min(len(evm_privates), len(aptos_privates))} pairs will be used.")
+
+        self.accounts = list(zip(evm_privates, aptos_privates))
+        self.threads = max(1, threads)
+        # Source network and balance of every EVM wallet, filled before the swap flow starts
+        self.sources = {}
+
+    def run(self, action: str, resume: bool = False):
+        """Run `action` for every account, with `resume` the latest run continues instead of a new one starting"""
+        flows = {
+            "1": [
+                Stage("usdc_to_aptos", self.bridge_to_aptos),
+                Stage("usdc_to_aptos_mined", self.bridge_mined, waits_for=self.bridge_receipt),
+                Stage("claim_on_aptos", self.claim, waits_for=self.deposit_arrived),
+                Stage("claim_on_aptos_committed", partial(self.committed, "claim_on_aptos"),
+                      waits_for=self.aptos_committed),
+            ],
+            "2": [
+                Stage("liquid_swap_usdc_to_aptos", self.swap),
+                Stage("usdc_from_aptos", self.bridge_back, waits_for=self.aptos_committed),
+                Stage("usdc_from_aptos_committed", partial(self.committed, "usdc_from_aptos"),
+                      waits_for=self.aptos_committed),
+            ],
+        }
+        stages = flows.get(action)
+        if stages is None:
+            logger.error(f"Unknown action -> {action}")
+            return
+
+        job_store.begin(resume)
+
+        with tracer.span("derive_keys"):
+            # Worker processes are not profiled, with CPU profiling on the keys are derived here to show up in it
+            keyring.derive_batch([aptos_mnemonic for _, aptos_mnemonic in self.accounts],
+                                 processes=1 if tracer.cpu else None)
+
+        if action == "1":
+            # Wallets with a bridge already sent or done resume from the job store and need no source network
+            wallets = [wallet for wallet in (Account.from_key(evm_private).address for evm_private, _ in self.accounts)
+                       if self.needs_source(wallet)]
+            if wallets:
+                with metrics.stage("balance_scan"), tracer.span("balance_scan"):
+                    self.sources = balances.BalanceScanner().pick_networks(wallets)
+
+        logger.info(f"Running {len(self.accounts)} accounts in {self.threads} threads")
+
+        pipeline = Pipeline(self.threads)
+        for index, (evm_private, aptos_mnemonic) in enumerate(self.accounts, start=1):
+            pipeline.add(f"Account {index}", partial(aptos_bridge.AptosBridge, evm_private, aptos_mnemonic), stages)
+        pipeline.join()
+
+    @staticmethod
+    def needs_source(wallet: str) -> bool:
+        job = job_store.get(wallet, "usdc_to_aptos")
+        return job is None or job.status == jobs.FAILED
+
+    def bridge_to_aptos(self, instance: aptos_bridge.AptosBridge, _):
+        source = self.sources.get(instance.evm_address)
+        if source is False:
+            logger.warning(f"{instance.evm_address} | No USDC balance in all networks.")
+            return False
+
+        # True when an earlier run finished the bridge, otherwise the hash to wait for
+        return instance.usdc_to_aptos(source, wait=False) or False
+
+    @staticmethod
+    def bridge_receipt(instance: aptos_bridge.AptosBridge, tx_hash, ready):
+        if tx_hash is True:
+            return ready(True, None)
+
+        confirmation_watchers.get(instance.network_to_swap).watch(
+            tx_hash, lambda receipt: ready(True, (tx_hash, receipt)))
+
+    @staticmethod
+    def bridge_mined(instance: aptos_bridge.AptosBridge, mined) -> bool:
+        if mined is None:
+            return True
+
+        return instance.finish_usdc_to_aptos(*mined)
+
+    @staticmethod
+    def deposit_arrived(instance: aptos_bridge.AptosBridge, _, ready):
+        if instance.claim_settled():
+            return ready(True)
+
+        deposit_detector.watch(instance.aptos_address, lambda deposit: ready(deposit is not None),
+                               instance.deposit_baseline())
+
+    @staticmethod
+    def claim(instance: aptos_bridge.AptosBridge, _):
+        return instance.claim_on_aptos(wait_for_deposit=False, wait=False)
+
+    @staticmethod
+    def swap(instance: aptos_bridge.AptosBridge, _):
+        return instance.liquid_swap_usdc_to_aptos(wait=False)
+
+    @staticmethod
+    def aptos_committed(instance: aptos_bridge.AptosBridge, tx_hash: str, ready):
+        """Waits for the Aptos transaction the previous stage submitted, the stage gets (tx_hash, transaction) or None
+        if nothing was submitted"""
+        if tx_hash is None:
+            return ready(True, None)
+
+        aptos_watcher.watch(tx_hash, lambda transaction: ready(True, (tx_hash, transaction)))
+
+    @staticmethod
+    def committed(step: str, instance: aptos_bridge.AptosBridge, committed):
+        if committed is not None:
+            instance.finish_aptos_transaction(step, *committed)
+
+    def bridge_back(self, instance: aptos_bridge.AptosBridge, swapped):
+        # A failed swap still leaves any USDC on the account to bridge back
+        self.committed("liquid_swap_usdc_to_aptos", instance, swapped)
+        return instance.usdc_from_aptos(wait=False)
@@ -0,0 +1,177 @@
+from collections import deque
+from loguru import logger
+from web3 import Web3
+import statistics
+import threading
+import time
+
+from .transport import transport
+from . import useful_data
+from . import rpc
+
+FEE_HISTORY_BLOCKS = 10
+FEE_HISTORY_PERCENTILE = 50
+SIMULATION_SAMPLES = 100
+RESIMULATE_EVERY = 50
+RESIMULATE_AFTER = 600
+ESTIMATE_MARGIN = 1.1
+
+
+class CachedQuote:
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+
+        self.lock = threading.Lock()
+        self.quote = None
+        self.updated = 0.0
+
+    def get(self):
+        """Quote shared by every caller for `ttl` seconds"""
+        # Callers arriving while a quote is being fetched wait for it instead of fetching their own
+        with self.lock:
+            if self.quote is None or time.monotonic() - self.updated > self.ttl:
+                try:
+                    self.quote = self.fetch()
+                    self.updated = time.monotonic()
+                except Exception as err:
+                    if self.quote is None:
+                        raise
+                    logger.warning(f"{self.name} | Failed to refresh gas price, using the last quote -> {err}")
+
+            return self.quote
+
+    def fetch(self):
+        raise NotImplementedError
+
+
+class GasOracle(CachedQuote):
+    def __init__(self, network: str, ttl: float):
+        super().__init__(network, ttl)
+        self.network = network
+
+    def fetch(self) -> tuple:
+        """(maxFeePerGas, maxPriorityFeePerGas) in gwei"""
+        try:
+            return self.fetch_owlracle()
+        except Exception as err:
+            logger.warning(f"{self.network} | Gas API unavailable, using eth_feeHistory -> {err}")
+            return self.fetch_fee_history()
+
+    def fetch_owlracle(self) -> tuple:
+        constants = useful_data.Data().constants
+        res = transport.get('{}/{}/gas?apikey={}'.format(constants["GAS_API_URL"], self.network.lower(),
+                                                         constants["GAS_API"]))
+        data = res.json()
+
+        if len(data.get('speeds', [])) < 2:
+            raise ValueError(f"Unexpected gas API response -> {data}")
+
+        second_speed = data['speeds'][1]
+        return second_speed['maxFeePerGas'], second_speed['maxPriorityFeePerGas']
+
+    def fetch_fee_history(self) -> tuple:
+        fee_history = rpc.web3_registry.get(self.network).eth.fee_history(FEE_HISTORY_BLOCKS, "latest",
+                                                                          [FEE_HISTORY_PERCENTILE])
+
+        # The last entry is the base fee of the next block
+        base_fee = fee_history["baseFeePerGas"][-1]
+        priority_fee = int(statistics.median(reward[0] for reward in fee_history["reward"]))
+        max_fee = 2 * base_fee + priority_fee
+
+        return float(Web3.from_wei(max_fee, "gwei")), float(Web3.from_wei(priority_fee, "gwei"))
+
+
+class AptosGasPrice(CachedQuote):
+    def __init__(self, node_urls: list, ttl: float):
+        super().__init__("Aptos", ttl)
+        self.node_urls = node_urls
+
+    def fetch(self) -> int:
+        """Gas unit price from the first node that answers"""
+        last_error = None
+        for node_url in self.node_urls:
+            try:
+                r = transport.get(f"{node_url}/estimate_gas_price",
+                                  headers={"Accept": "application/json, application/x-bcs"}).json()
+                return int(r["gas_estimate"])
+            except Exception as err:
+                logger.warning(f"Aptos | Failed to get gas price from {node_url} -> {err}")
+                last_error = err
+
+        raise last_error or ValueError("No Aptos nodes configured")
+
+
+class GasEstimates:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (function, type arguments) -> {"samples", "uses", "updated", "stale"}
+        self.entries = {}
+
+    def get(self, key: tuple, simulate) -> int:
+        """Max gas amount, margin included, for transactions calling `key` = (function, type arguments), `simulate()`
+        only runs when the cached estimate is due for a refresh"""
+        with self.lock:
+            entry = self.entries.setdefault(key, {"samples": deque(maxlen=SIMULATION_SAMPLES), "uses": 0,
+                                                  "updated": 0.0, "stale": True})
+            # Without samples yet every caller simulates, there is no cached estimate to hand out
+            refresh = (entry["stale"] or not entry["samples"] or entry["uses"] >= RESIMULATE_EVERY
+                       or time.monotonic() - entry["updated"] > RESIMULATE_AFTER)
+            if not refresh:
+                entry["uses"] += 1
+                return int(self.percentile(entry["samples"], 95) * ESTIMATE_MARGIN)
+
+            # Other callers keep using the cached estimate while this one simulates
+            entry["stale"] = False
+            entry["uses"] = 0
+            entry["updated"] = time.monotonic()
+
+        try:
+            gas = int(simulate())
+        except Exception:
+            self.invalidate(key)
+            raise
+
+        with self.lock:
+            entry["samples"].append(gas)
+
+        return int(gas * ESTIMATE_MARGIN)
+
+    def invalidate(self, key: tuple):
+        """Force a fresh simulation for the next transaction calling the same function, e.g. after a failure"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["stale"] = True
+
+    @staticmethod
+    def percentile(samples, percent: int) -> int:
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+
+class GasOracles:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.oracles = {}
+
+    def get(self, network: str) -> GasOracle:
+        return self.get_or_create(network, lambda data: GasOracle(network, data.gas_cache_ttl))
+
+    def get_aptos(self) -> AptosGasPrice:
+        return self.get_or_create("Aptos", lambda data: AptosGasPrice(data.constants["aptos"]["APTOS_NODE_URLS"],
+                                                                     data.gas_cache_ttl))
+
+    def get_or_create(self, name: str, create) -> CachedQuote:
+        oracle = self.oracles.get(name)
+        if oracle is None:
+            with self.lock:
+                oracle = self.oracles.get(name)
+                if oracle is None:
+                    oracle = self.oracles[name] = create(useful_data.Data())
+
+        return oracle
+
+
+gas_oracles = GasOracles()
+gas_estimates = GasEstimates()
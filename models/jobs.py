@@ -0,0 +1,160 @@
+from typing import NamedTuple
+from loguru import logger
+import threading
+import sqlite3
+import json
+import time
+
+SENT = "sent"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    step TEXT NOT NULL,
+    status TEXT NOT NULL,
+    network TEXT,
+    tx_hash TEXT,
+    nonce INTEGER,
+    raw_tx BLOB,
+    extra TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (run, account, step)
+)
+"""
+# Job stores written before runs were numbered hold a single run
+MIGRATE = """
+ALTER TABLE jobs RENAME TO jobs_unnumbered;
+""" + SCHEMA + """;
+INSERT INTO jobs SELECT 1, * FROM jobs_unnumbered;
+DROP TABLE jobs_unnumbered;
+"""
+
+
+class Job(NamedTuple):
+    account: str
+    step: str
+    status: str
+    network: str
+    tx_hash: str
+    nonce: int
+    # signed transaction, rebroadcast as is when a run resumes before it was confirmed
+    raw_tx: bytes
+    extra: dict
+    created: float
+    updated: float
+
+
+class JobStore:
+    """Stage of every account step, so a resumed run skips finished work and picks up sent transactions
+
+    Jobs belong to a numbered run. `begin` starts the next run, where every step starts from scratch, or with
+    `resume` continues the latest one.
+    """
+
+    def __init__(self, path: str = "data/jobs.sqlite3"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = None
+        self.run = None
+
+    def connect(self) -> sqlite3.Connection:
+        if self.connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # every write is fsynced to the log before the transaction it describes is broadcast
+            connection.execute("PRAGMA synchronous=FULL")
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(jobs)")]
+            if columns and "run" not in columns:
+                connection.executescript(f"BEGIN; {MIGRATE} COMMIT;")
+            connection.execute(SCHEMA)
+            self.connection = connection
+
+        return self.connection
+
+    def begin(self, resume: bool = False) -> int:
+        """Pick the run later calls work on, the latest one with `resume`, otherwise a new one"""
+        with self.lock:
+            connection = self.connect()
+            latest = connection.execute("SELECT MAX(run) FROM jobs").fetchone()[0] or 0
+            self.run = latest if resume and latest else latest + 1
+            unconfirmed = connection.execute("SELECT COUNT(*) FROM jobs WHERE run = ? AND status = ?",
+                                             (latest, SENT)).fetchone()[0]
+
+        if resume:
+            logger.info(f"Resuming run {self.run}")
+        elif unconfirmed:
+            logger.warning(f"Run {latest} left {unconfirmed} transactions unconfirmed, they are not resumed in the "
+                           f"new run {self.run}, start with --resume to wait for them instead")
+        return self.run
+
+    def current_run(self) -> int:
+        if self.run is None:
+            self.begin()
+        return self.run
+
+    def get(self, account: str, step: str):
+        run = self.current_run()
+        with self.lock:
+            row = self.connect().execute("SELECT * FROM jobs WHERE run = ? AND account = ? AND step = ?",
+                                         (run, str(account), step)).fetchone()
+
+        if row is None:
+            return None
+        row = row[1:]
+        return Job(*row[:7], json.loads(row[7]) if row[7] else {}, *row[8:])
+
+    def start(self, account: str, step: str, network: str, nonce: int, raw_tx: bytes, tx_hash: str = None,
+              extra: dict = None):
+        """Record a new signed attempt as SENT, replacing every field a previous attempt left"""
+        run, now = self.current_run(), time.time()
+        with self.lock:
+            self.connect().execute(
+                """
+                INSERT INTO jobs (run, account, step, status, network, tx_hash, nonce, raw_tx, extra, created, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run, account, step) DO UPDATE SET
+                    status = excluded.status,
+                    network = excluded.network,
+                    tx_hash = excluded.tx_hash,
+                    nonce = excluded.nonce,
+                    raw_tx = excluded.raw_tx,
+                    extra = excluded.extra,
+                    updated = excluded.updated
+                """,
+                (run, str(account), step, SENT, network, tx_hash, nonce, raw_tx,
+                 json.dumps(extra) if extra is not None else None, now, now))
+
+    def save(self, account: str, step: str, status: str, network: str = None, tx_hash: str = None,
+             nonce: int = None, raw_tx: bytes = None, extra: dict = None):
+        """Insert or update a job, fields left as None keep their saved value"""
+        run, now = self.current_run(), time.time()
+        with self.lock:
+            self.connect().execute(
+                """
+                INSERT INTO jobs (run, account, step, status, network, tx_hash, nonce, raw_tx, extra, created, updated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run, account, step) DO UPDATE SET
+                    status = excluded.status,
+                    network = COALESCE(excluded.network, network),
+                    tx_hash = COALESCE(excluded.tx_hash, tx_hash),
+                    nonce = COALESCE(excluded.nonce, nonce),
+                    raw_tx = COALESCE(excluded.raw_tx, raw_tx),
+                    extra = COALESCE(excluded.extra, extra),
+                    updated = excluded.updated
+                """,
+                (run, str(account), step, status, network, tx_hash, nonce, raw_tx,
+                 json.dumps(extra) if extra is not None else None, now, now))
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+            self.run = None
+
+
+job_store = JobStore()
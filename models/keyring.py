@@ -0,0 +1,63 @@
+from concurrent.futures import ProcessPoolExecutor
+from aptos_sdk.account import Account as AptosAccount
+import threading
+import os
+
+
+class Keyring:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.private_keys = {}
+        self.accounts = {}
+
+    @staticmethod
+    def derive_private_key(mnemonic: str) -> str:
+        words = mnemonic.split(" ")
+        if len(words) > 6:
+            # ecdsa loads only once a mnemonic has to be derived
+            from .utilities import aptos_lib
+            return aptos_lib.PublicKeyUtils(mnemonic).private_key.hex()
+
+        return mnemonic
+
+    def get_private_key(self, mnemonic: str) -> str:
+        private_key = self.private_keys.get(mnemonic)
+        if private_key is None:
+            private_key = self.derive_private_key(mnemonic)
+            with self.lock:
+                self.private_keys.setdefault(mnemonic, private_key)
+
+        return private_key
+
+    def get_account(self, mnemonic: str) -> AptosAccount:
+        account = self.accounts.get(mnemonic)
+        if account is None:
+            account = AptosAccount.load_key(self.get_private_key(mnemonic))
+            with self.lock:
+                account = self.accounts.setdefault(mnemonic, account)
+
+        return account
+
+    def get_address(self, mnemonic: str):
+        return self.get_account(mnemonic).address()
+
+    def derive_batch(self, mnemonics: list, processes: int = None) -> list:
+        """Derive keys for all `mnemonics` in a process pool, returns (address, private key) pairs in input order"""
+        missing = list(dict.fromkeys(mnemonic for mnemonic in mnemonics if mnemonic not in self.private_keys))
+        processes = min(processes or os.cpu_count() or 1, len(missing))
+
+        if processes > 1:
+            chunksize = max(1, len(missing) // (processes * 4))
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                private_keys = list(executor.map(self.derive_private_key, missing, chunksize=chunksize))
+        else:
+            private_keys = [self.derive_private_key(mnemonic) for mnemonic in missing]
+
+        with self.lock:
+            for mnemonic, private_key in zip(missing, private_keys):
+                self.private_keys.setdefault(mnemonic, private_key)
+
+        return [(self.get_address(mnemonic), self.private_keys[mnemonic]) for mnemonic in mnemonics]
+
+
+keyring = Keyring()
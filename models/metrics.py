@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+from loguru import logger
+import threading
+import bisect
+import atexit
+import json
+import time
+import re
+import os
+
+# Upper bounds of the latency histogram buckets, seconds
+BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+NO_STAGE = "none"
+
+HEX = re.compile(r"0x[0-9a-fA-F]+")
+TYPE_ARGUMENTS = re.compile(r"<[^/]*")
+NUMBER = re.compile(r"/\d+(?=/|$)")
+
+
+def path_label(path: str) -> str:
+    """Request path with addresses, hashes, type arguments and numbers folded so every call maps to few labels"""
+    return NUMBER.sub("/:n", HEX.sub(":hex", TYPE_ARGUMENTS.sub("", path)))
+
+
+class Series:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        # Per bucket counts, the last one is +Inf
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds: float, error: bool):
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+class Metrics:
+    """Counts, errors and latency histograms of outbound calls by endpoint, method and flow stage"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (endpoint, method, stage) -> Series
+        self.series = {}
+        # (name, ((label, value), ...)) -> count
+        self.counters = {}
+        self.local = threading.local()
+        self.path = None
+        self.thread = None
+
+    def current_stage(self) -> str:
+        return getattr(self.local, "stage", NO_STAGE)
+
+    def set_stage(self, stage: str):
+        self.local.stage = stage
+
+    @contextmanager
+    def stage(self, stage: str):
+        previous = self.current_stage()
+        self.set_stage(stage)
+        try:
+            yield
+        finally:
+            self.set_stage(previous)
+
+    def observe(self, endpoint: str, method: str, seconds: float, error: bool = False):
+        key = (endpoint, method, self.current_stage())
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = Series()
+            series.observe(seconds, error)
+
+    def count(self, name: str, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def retrying(self, function: str):
+        """`retry_on_exception` for @retry that counts every failed attempt of `function`"""
+        def retry_on_exception(err) -> bool:
+            self.count("retries", function=function)
+            return True
+
+        return retry_on_exception
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            series = [{
+                "endpoint": endpoint,
+                "method": method,
+                "stage": stage,
+                "count": item.count,
+                "errors": item.errors,
+                "seconds": item.total,
+                "buckets": dict(zip([*map(str, BUCKETS), "+Inf"], item.buckets)),
+            } for (endpoint, method, stage), item in sorted(self.series.items())]
+            counters = [{"name": name, "labels": dict(labels), "count": count}
+                        for (name, labels), count in sorted(self.counters.items())]
+
+        return {"timestamp": time.time(), "requests": series, "counters": counters}
+
+    def prometheus(self) -> str:
+        snapshot = self.snapshot()
+        requests = [(",".join(f'{name}="{escape(item[name])}"' for name in ("endpoint", "method", "stage")), item)
+                    for item in snapshot["requests"]]
+
+        lines = ["# TYPE bridge_requests_total counter"]
+        lines += [f"bridge_requests_total{{{labels}}} {item['count']}" for labels, item in requests]
+        lines.append("# TYPE bridge_request_errors_total counter")
+        lines += [f"bridge_request_errors_total{{{labels}}} {item['errors']}" for labels, item in requests]
+
+        lines.append("# TYPE bridge_request_duration_seconds histogram")
+        for labels, item in requests:
+            cumulative = 0
+            for bound, count in item["buckets"].items():
+                cumulative += count
+                lines.append(f'bridge_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"bridge_request_duration_seconds_sum{{{labels}}} {item['seconds']:.6f}")
+            lines.append(f"bridge_request_duration_seconds_count{{{labels}}} {item['count']}")
+
+        for name in sorted({counter["name"] for counter in snapshot["counters"]}):
+            lines.append(f"# TYPE bridge_{name}_total counter")
+            for counter in (counter for counter in snapshot["counters"] if counter["name"] == name):
+                labels = ",".join(f'{label}="{escape(value)}"' for label, value in counter["labels"].items())
+                lines.append(f"bridge_{name}_total{{{labels}}} {counter['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str = None):
+        """Write a Prometheus text file, or a JSON snapshot when the path ends with .json"""
+        path = path or self.path
+        if not path:
+            return
+
+        content = json.dumps(self.snapshot(), indent=2) if path.endswith(".json") else self.prometheus()
+        # Replace the file in one step so a collector never reads it half written
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            f.write(content)
+        os.replace(temporary, path)
+
+    def start(self, path: str, interval: float):
+        """Export to `path` every `interval` seconds and at exit, an empty path disables the export"""
+        with self.lock:
+            if not path or self.path is not None:
+                return
+
+            self.path = path
+            atexit.register(self.export)
+            if interval > 0:
+                self.thread = threading.Thread(target=self.run, args=(interval,), name="metrics", daemon=True)
+                self.thread.start()
+
+    def run(self, interval: float):
+        while True:
+            time.sleep(interval)
+            try:
+                self.export()
+            except Exception as err:
+                logger.warning(f"Failed to export metrics to {self.path} -> {err}")
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
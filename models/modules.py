@@ -1,17 +1,16 @@
-from aptos_sdk.account import Account as AptosAccount
 from random import uniform, randint
 from eth_account import Account
-from aptc import new_client
-from retrying import retry
 from loguru import logger
 from web3 import Web3
-from time import sleep
-import requests
-import json
 
 
-from .utilities import aptos_lib
+from .aptos_node import aptos_node
+from .gas import gas_oracles, gas_estimates
+from .keyring import keyring
+from . import aptos_transactions
 from . import useful_data
+from . import balances
+from . import rpc
 
 
 class Evm:
@@ -23,63 +22,30 @@ class Evm:
 
         self.useful_data = useful_data.Data()
 
-    def get_maximum_balance_network(self, wallet_address: str) -> str or None:
-        networks_to_swap = ["Polygon", "Avalanche"]
+    def get_maximum_balance_network(self, wallet_address: str) -> tuple or bool:
+        max_balance_network = balances.BalanceScanner().pick_networks([wallet_address])[wallet_address]
 
-        balances = {
-            "Polygon": self.get_balance_usdc(wallet_address, self.useful_data.constants["usdc_contracts"]["Polygon"],
-                                             "Polygon"),
-            "Avalanche": self.get_balance_usdc(wallet_address,
-                                               self.useful_data.constants["usdc_contracts"]["Avalanche"], "Avalanche"),
-        }
-
-        max_balance_network = max(balances, key=balances.get)
-
-        networks_to_swap.remove(max_balance_network)
-        max_balance_network = max(balances, key=balances.get)
-        max_balance = balances[max_balance_network]
-
-        if max_balance < 1:
+        if max_balance_network is None:
+            raise ValueError(f"Failed to read the USDC balances of {wallet_address}")
+        if not max_balance_network:
             logger.warning("No USDC balance in all networks.")
             return False
 
-        return max_balance_network, balances[max_balance_network]
-
-    @retry(stop_max_attempt_number=5, wait_fixed=2000)
-    def get_balance_usdc(self, wallet_address, contract_address, network: str):
-        w3 = self.get_web3_instance(self.useful_data.constants["networks"][network]["urls"])
-
-        contract = w3.eth.contract(address=contract_address, abi=self.useful_data.constants["ERC20_ABI"])
-        return contract.functions.balanceOf(wallet_address).call()
-
-    def get_web3_instance(self, rpc_urls: list) -> Web3(Web3.HTTPProvider()) or bool:
-        for rpc in rpc_urls:
-            w3 = Web3(Web3.HTTPProvider(rpc))
-            if w3.is_connected():
-                return w3
+        return max_balance_network
 
-        logger.error("Failed to connect to EVM RPC!")
-        return False
+    def get_web3_instance(self, network: str) -> Web3:
+        return rpc.web3_registry.get(network)
 
     def get_gas_data(self, network: str):
-        network_lower = network.lower()
-        res = requests.get(
-            'https://api.owlracle.info/v4/{}/gas?apikey={}'.format(network_lower,
-                                                                   self.useful_data.constants["GAS_API"]))
-        data = res.json()
+        max_fee_per_gas, max_priority_fee_per_gas = gas_oracles.get(network).get()
 
-        if len(data['speeds']) >= 2:
-            second_speed = data['speeds'][1]
+        # Generate a random multiplier between 1.111 and 1.297
+        multiplier = uniform(1.111, 1.297)
 
-            # Generate a random multiplier between 1.111 and 1.297
-            multiplier = uniform(1.111, 1.297)
+        # Multiply the maxFeePerGas value by the random multiplier
+        adjusted_max_fee_per_gas = max_fee_per_gas * multiplier
 
-            # Multiply the maxFeePerGas value by the random multiplier
-            adjusted_max_fee_per_gas = second_speed['maxFeePerGas'] * multiplier
-
-            return adjusted_max_fee_per_gas, second_speed['maxPriorityFeePerGas']
-        else:
-            return None
+        return adjusted_max_fee_per_gas, max_priority_fee_per_gas
 
     def get_fee(self, aptos_contract, w3, call_params, adapter_params):
         fees = aptos_contract.functions.quoteForSend(call_params, adapter_params).call()
@@ -89,40 +55,6 @@ class Evm:
     def get_allowance(self, usdc_contract, account_address, stargate_address):
         return usdc_contract.functions.allowance(account_address, stargate_address).call()
 
-    def approve_and_retry(self, account, amount, nonce, max_fee_per_gas, max_priority_fee_per_gas, w3, network,
-                          usdc_contract, stargate_address, tx_url):
-        approval_success = False
-        approval_attempts = 0
-        while not approval_success and approval_attempts < 3:
-            approve_txn_hash = self.approve_usdc(account, usdc_contract, stargate_address, amount, nonce,
-                                                 max_fee_per_gas, max_priority_fee_per_gas, w3)
-            sleep_duration = randint(20, 60)
-            logger.info(
-                f'Sent USDC approve transaction {tx_url}{approve_txn_hash.hex()}, waiting {sleep_duration} seconds')
-            sleep(sleep_duration)
-            nonce += 1
-            try:
-                tx_info = w3.eth.get_transaction(approve_txn_hash)
-                if tx_info is None:
-                    logger.error('Transaction not found')
-                else:
-                    receipt = w3.eth.get_transaction_receipt(approve_txn_hash)
-                    if receipt is None:
-                        logger.info('Transaction not confirmed yet')
-                    elif receipt['status'] == 1:
-                        logger.success(f"{network} | USDC APPROVED {tx_url}{approve_txn_hash.hex()}")
-                        approval_success = True
-                    else:
-                        logger.error(f'Transaction failed {tx_url}{approve_txn_hash.hex()}')
-                        approval_attempts += 1
-            except Exception as e:
-                logger.error(f'Error: {e}')
-                approval_attempts += 1
-
-        if not approval_success:
-            logger.error("Failed to approve USDC after 3 attempts")
-            return None
-
     def approve_usdc(self, account, usdc_contract, stargate_address, amount, nonce, max_fee_per_gas,
                      max_priority_fee_per_gas, w3):
         approve_txn_obj = usdc_contract.functions.approve(stargate_address, int(amount))
@@ -135,9 +67,7 @@ class Evm:
             'nonce': nonce,
         })
         signed_approve_txn = w3.eth.account.sign_transaction(approve_txn, account.key)
-        approve_txn_hash = w3.eth.send_raw_transaction(signed_approve_txn.rawTransaction)
-
-        return approve_txn_hash
+        return rpc.send_raw_transaction(w3, signed_approve_txn)
 
     def create_adapter_params(self, network: str, aptos_wallet, version: int = 2) -> bytes:
         gas_amount = randint(5000, 7000)
@@ -161,34 +91,26 @@ class Evm:
 class Aptos:
     def __init__(self, mnemonic: str):
         self.mnemonic = mnemonic
+        self.transaction_builder = None
 
     def get_aptos_account(self):
-        return AptosAccount.load_key(self.mnemonic_to_private_key())
+        return keyring.get_account(self.mnemonic)
 
     def get_wallet_address(self):
-        return AptosAccount.load_key(self.mnemonic_to_private_key()).address()
+        return keyring.get_address(self.mnemonic)
 
     def get_account_balance(self):
-        return new_client().get_account_balance(self.get_wallet_address())
+        return aptos_node.get_account_balance(self.get_wallet_address())
 
     def mnemonic_to_private_key(self) -> hex:
-        words = self.mnemonic.split(" ")
-        if len(words) > 6:
-            instance = aptos_lib.PublicKeyUtils(self.mnemonic)
-            private_key = instance.mnemonic_to_private_key(self.mnemonic).hex()
-        else:
-            private_key = self.mnemonic
-
-        return private_key
-
-    def get_gas_amount(self, payload: dict) -> str:
-        import requests
-
-        resp = requests.post("https://rpc.ankr.com/http/aptos/v1/transactions/simulate",
-                             headers={
-                                 "Accept": "application/json, application/x-bcs",
-                                 "Content-Type": "application/json"
-                             },
-                             data=json.dumps(payload))
-
-        return resp.json()[0]["gas_used"]
+        return keyring.get_private_key(self.mnemonic)
+
+    def get_transaction_builder(self) -> aptos_transactions.AptosTransactionBuilder:
+        if self.transaction_builder is None:
+            self.transaction_builder = aptos_transactions.AptosTransactionBuilder(self.get_aptos_account())
+
+        return self.transaction_builder
+
+    def get_gas_amount(self, raw_transaction) -> int:
+        return gas_estimates.get(aptos_transactions.estimate_key(raw_transaction),
+                                 lambda: self.get_transaction_builder().simulate(raw_transaction))
@@ -0,0 +1,49 @@
+import threading
+
+from . import rpc
+
+# "already known" and "replacement transaction underpriced" are left out, both mean a transaction with this nonce
+# is already in the mempool and a retry with a fresh nonce could send the bridge twice
+NONCE_ERRORS = (
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+)
+
+
+class NonceManager:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (network, address) -> lock guarding that address' nonce
+        self.locks = {}
+        self.nonces = {}
+
+    def next(self, network: str, address: str) -> int:
+        """Next free nonce of `address`, read from the chain once and handed out locally afterwards"""
+        key = (network, address)
+        with self.key_lock(key):
+            # Only this address waits for its first read, other addresses allocate meanwhile
+            if key not in self.nonces:
+                self.nonces[key] = rpc.web3_registry.get(network).eth.get_transaction_count(address, "pending")
+
+            nonce = self.nonces[key]
+            self.nonces[key] += 1
+
+        return nonce
+
+    def key_lock(self, key: tuple) -> threading.Lock:
+        with self.lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def resync(self, network: str, address: str):
+        key = (network, address)
+        with self.key_lock(key):
+            self.nonces.pop(key, None)
+
+    @staticmethod
+    def is_nonce_error(err) -> bool:
+        message = str(err).lower()
+        return any(error in message for error in NONCE_ERRORS)
+
+
+nonce_manager = NonceManager()
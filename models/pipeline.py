@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Callable
+from loguru import logger
+import threading
+import time
+
+from .profiling import tracer
+from .metrics import metrics
+
+# A wait condition that raises, e.g. on a node error, is set up again after 5, 10, 20... seconds
+WAIT_RETRIES = 5
+WAIT_RETRY_DELAY = 5
+
+
+class Stage(NamedTuple):
+    name: str
+    # (instance, previous stage result) -> result, returning False ends the account's pipeline
+    run: Callable
+    # (instance, previous stage result, ready) -> None, calls ready(True) once the stage may run or ready(False)
+    # to give up; the wait holds no worker thread. ready(True, value) runs the stage with value instead of the
+    # previous result
+    waits_for: Callable = None
+
+
+class Pipeline:
+    """Runs the stages of every account on a shared pool, a stage starts as soon as what it waits for holds"""
+
+    def __init__(self, threads: int):
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.condition = threading.Condition()
+        self.total = 0
+        self.running = 0
+
+    def add(self, label: str, make_instance: Callable, stages: list):
+        with self.condition:
+            self.total += 1
+            self.running += 1
+
+        self.executor.submit(self.start, label, make_instance, stages)
+
+    def join(self):
+        with self.condition:
+            self.condition.wait_for(lambda: self.running == 0)
+
+        self.executor.shutdown()
+
+    def start(self, label: str, make_instance: Callable, stages: list):
+        try:
+            with metrics.stage("setup"), tracer.account(label), tracer.span("setup"):
+                instance = make_instance()
+        except Exception as err:
+            logger.exception(f"{label} | Account setup failed -> {err}")
+            return self.finish(label)
+
+        self.next(label, instance, stages, 0, None)
+
+    def next(self, label: str, instance, stages: list, index: int, previous):
+        if index == len(stages):
+            return self.finish(label)
+
+        stage = stages[index]
+        if stage.waits_for is None:
+            return self.execute(label, instance, stages, index, previous)
+
+        waiting = time.perf_counter()
+        called = threading.Event()
+
+        def ready(ok: bool, value=previous):
+            # A retried wait condition may have left a callback behind, only the first answer counts
+            with self.condition:
+                if called.is_set():
+                    return
+                called.set()
+
+            tracer.record(f"wait {stage.name}", waiting, category="wait", account=label)
+            if ok:
+                self.executor.submit(self.execute, label, instance, stages, index, value)
+            else:
+                logger.error(f"{label} | Gave up waiting to start {stage.name}")
+                self.finish(label)
+
+        self.wait(label, instance, stage, previous, ready, 0)
+
+    def wait(self, label: str, instance, stage: Stage, previous, ready: Callable, attempt: int):
+        try:
+            with metrics.stage(stage.name), tracer.account(label):
+                stage.waits_for(instance, previous, ready)
+        except Exception as err:
+            if attempt >= WAIT_RETRIES:
+                logger.exception(f"{label} | Failed to wait for {stage.name} -> {err}")
+                return ready(False)
+
+            delay = WAIT_RETRY_DELAY * 2 ** attempt
+            logger.warning(f"{label} | Failed to wait for {stage.name}, retrying in {delay} s -> {err}")
+            timer = threading.Timer(delay, self.wait, (label, instance, stage, previous, ready, attempt + 1))
+            timer.daemon = True
+            timer.start()
+
+    def execute(self, label: str, instance, stages: list, index: int, previous):
+        stage = stages[index]
+        try:
+            with metrics.stage(stage.name), tracer.account(label), tracer.span(stage.name):
+                result = stage.run(instance, previous)
+        except Exception as err:
+            logger.exception(f"{label} | {stage.name} failed -> {err}")
+            return self.finish(label)
+
+        if result is False:
+            return self.finish(label)
+
+        self.next(label, instance, stages, index + 1, result)
+
+    def finish(self, label: str):
+        with self.condition:
+            self.running -= 1
+            finished = self.total - self.running
+            self.condition.notify_all()
+
+        logger.info(f"{label} finished ({finished}/{self.total})")
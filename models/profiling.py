@@ -0,0 +1,137 @@
+from contextlib import contextmanager
+from loguru import logger
+import threading
+import cProfile
+import pstats
+import json
+import time
+import os
+
+
+class Tracer:
+    """Timing spans of every account's stages, written as a Chrome trace (chrome://tracing, Perfetto, speedscope)
+
+    Spans run on the track of the account they belong to, whichever worker thread runs them, and carry the CPU
+    time the thread spent inside them so network waits stand apart from local work.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.events = []
+        # account label -> trace thread id
+        self.tracks = {}
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+        # One cProfile.Profile per thread when CPU profiling is on, None otherwise
+        self.profiles = None
+
+    def start(self, cpu: bool = False):
+        self.enabled = True
+        self.origin = time.perf_counter()
+        if cpu:
+            self.profiles = []
+
+    @property
+    def cpu(self) -> bool:
+        return self.profiles is not None
+
+    def current_account(self) -> str:
+        return getattr(self.local, "account", None) or threading.current_thread().name
+
+    def track(self, account: str) -> int:
+        track = self.tracks.get(account)
+        if track is None:
+            with self.lock:
+                track = self.tracks.get(account)
+                if track is None:
+                    track = self.tracks[account] = len(self.tracks) + 1
+                    self.events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": track,
+                                        "args": {"name": account}})
+
+        return track
+
+    @contextmanager
+    def account(self, label: str):
+        """Attribute the spans of this thread to `label` and profile it while inside"""
+        if not self.enabled:
+            yield
+            return
+
+        previous = getattr(self.local, "account", None)
+        self.local.account = label
+        # Only the outermost account of a thread switches its profile
+        profile = self.thread_profile() if previous is None else None
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            self.local.account = previous
+
+    def thread_profile(self):
+        if self.profiles is None:
+            return None
+
+        profile = getattr(self.local, "profile", None)
+        if profile is None:
+            # CPU time of the thread, so blocking on the network does not show up as a hot spot
+            profile = self.local.profile = cProfile.Profile(time.thread_time)
+            with self.lock:
+                self.profiles.append(profile)
+
+        return profile
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args):
+        if not self.enabled:
+            yield
+            return
+
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, started, category=category, cpu=time.thread_time() - cpu_started, **args)
+
+    def record(self, name: str, started: float, finished: float = None, category: str = "stage",
+               account: str = None, cpu: float = None, **args):
+        """Add a span that began at perf_counter() `started`, for waits that start and end on different threads"""
+        if not self.enabled:
+            return
+
+        finished = time.perf_counter() if finished is None else finished
+        if cpu is not None:
+            args["cpu_ms"] = round(cpu * 1000, 3)
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (started - self.origin) * 1e6,
+            "dur": (finished - started) * 1e6,
+            "pid": 1,
+            "tid": self.track(account or self.current_account()),
+            "args": args,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def write(self, path: str):
+        """Write the trace to `path` and, with CPU profiling on, the merged profile next to it as .prof"""
+        with self.lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Wrote {len(events)} trace events to {path}")
+
+        if self.profiles:
+            profile_path = f"{os.path.splitext(path)[0]}.prof"
+            stats = pstats.Stats(*self.profiles)
+            stats.dump_stats(profile_path)
+            logger.info(f"Wrote the CPU profile to {profile_path}, top functions by own time:")
+            stats.sort_stats("tottime").print_stats(15)
+
+
+tracer = Tracer()
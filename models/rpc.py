@@ -0,0 +1,170 @@
+from web3.providers import JSONBaseProvider
+from loguru import logger
+from web3 import Web3
+import threading
+import json
+import time
+
+from .transport import transport
+from .metrics import metrics
+from . import useful_data
+
+HEADERS = {"Content-Type": "application/json"}
+LATENCY_SMOOTHING = 0.3
+LATENCY_FLOOR = 0.05
+FAILURES_BEFORE_COOLDOWN = 3
+MAX_COOLDOWN = 300
+RATE_LIMIT_CODES = (-32005, -32090, 429)
+KNOWN_TRANSACTION_ERRORS = ("already known", "known transaction")
+
+
+class Endpoint:
+    def __init__(self, url: str):
+        self.url = url
+
+        self.latency = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.disabled_until = 0.0
+
+    def score(self) -> float:
+        error_rate = self.errors / self.requests if self.requests else 0.0
+        # The floor keeps failing endpoints without a latency sample behind healthy ones
+        return (self.latency + LATENCY_FLOOR) * (1 + 4 * error_rate)
+
+    def post(self, request_data: bytes, method: str) -> bytes:
+        response = transport.post(self.url, content=request_data, headers=HEADERS,
+                                  extensions={"endpoint": self.url, "method": method})
+        response.raise_for_status()
+        return response.content
+
+
+class EndpointPool(JSONBaseProvider):
+    def __init__(self, network: str, urls: list):
+        super().__init__()
+        self.network = network
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.lock = threading.Lock()
+
+    def ranked(self) -> list:
+        now = time.monotonic()
+        with self.lock:
+            available = sorted((endpoint for endpoint in self.endpoints if endpoint.disabled_until <= now),
+                               key=Endpoint.score)
+            disabled = sorted((endpoint for endpoint in self.endpoints if endpoint.disabled_until > now),
+                              key=lambda endpoint: endpoint.disabled_until)
+
+        return available + disabled
+
+    def report_success(self, endpoint: Endpoint, latency: float):
+        with self.lock:
+            endpoint.requests += 1
+            endpoint.consecutive_errors = 0
+            if endpoint.requests == 1:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += LATENCY_SMOOTHING * (latency - endpoint.latency)
+
+    def report_failure(self, endpoint: Endpoint, err):
+        with self.lock:
+            endpoint.requests += 1
+            endpoint.errors += 1
+            endpoint.consecutive_errors += 1
+
+            if endpoint.consecutive_errors >= FAILURES_BEFORE_COOLDOWN:
+                cooldown = min(MAX_COOLDOWN, 15 * 2 ** (endpoint.consecutive_errors - FAILURES_BEFORE_COOLDOWN))
+                endpoint.disabled_until = time.monotonic() + cooldown
+                logger.warning(f"{self.network} | RPC {endpoint.url} disabled for {cooldown} seconds -> {err}")
+
+    @staticmethod
+    def is_rate_limited(response) -> bool:
+        error = response.get("error") if isinstance(response, dict) else None
+        if not isinstance(error, dict):
+            return False
+
+        return error.get("code") in RATE_LIMIT_CODES or "rate limit" in str(error.get("message", "")).lower()
+
+    def dispatch(self, send):
+        last_error = None
+        for endpoint in self.ranked():
+            started = time.perf_counter()
+            try:
+                response = send(endpoint)
+            except Exception as err:
+                self.report_failure(endpoint, err)
+                last_error = err
+                continue
+
+            rate_limited = [item for item in (response if isinstance(response, list) else [response])
+                            if self.is_rate_limited(item)]
+            if rate_limited:
+                metrics.count("rate_limited", endpoint=endpoint.url)
+                self.report_failure(endpoint, rate_limited[0]["error"])
+                last_error = ConnectionError(f"{endpoint.url} rate limited -> {rate_limited[0]['error']}")
+                continue
+
+            self.report_success(endpoint, time.perf_counter() - started)
+            return response
+
+        logger.error(f"Failed to connect to {self.network} RPC!")
+        raise last_error or ConnectionError(f"No RPC endpoints configured for {self.network}")
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        return self.dispatch(lambda endpoint: self.decode_rpc_response(endpoint.post(request_data, method)))
+
+    def make_batch_request(self, calls: list) -> list:
+        """Send [(method, params), ...] as one JSON-RPC batch, returns the responses in call order"""
+        request_data = json.dumps([{"jsonrpc": "2.0", "method": method, "params": params, "id": index}
+                                   for index, (method, params) in enumerate(calls)]).encode()
+        batch_method = f"batch[{'+'.join(sorted({method for method, _ in calls}))}]"
+
+        def send(endpoint: Endpoint) -> list:
+            response = json.loads(endpoint.post(request_data, batch_method))
+            if not isinstance(response, list) or len(response) != len(calls):
+                raise ValueError(f"{endpoint.url} does not support JSON-RPC batches -> {str(response)[:200]}")
+
+            return sorted(response, key=lambda item: item["id"])
+
+        return self.dispatch(send)
+
+
+def is_rpc_error(err) -> bool:
+    """Whether `err` is a JSON-RPC error answer, the node received the request and refused it"""
+    return isinstance(err, ValueError) and bool(err.args) and isinstance(err.args[0], dict)
+
+
+def send_raw_transaction(w3: Web3, signed_transaction):
+    """Broadcast `signed_transaction`, a node that already holds it counts as sent
+
+    After a failover the next endpoint often has the transaction from the one that timed out.
+    """
+    try:
+        return w3.eth.send_raw_transaction(signed_transaction.rawTransaction)
+    except Exception as err:
+        if not is_rpc_error(err) or not any(error in str(err).lower() for error in KNOWN_TRANSACTION_ERRORS):
+            raise
+
+        logger.debug(f"{signed_transaction.hash.hex()} already known to the node")
+        return signed_transaction.hash
+
+
+class Web3Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.instances = {}
+
+    def get(self, network: str) -> Web3:
+        w3 = self.instances.get(network)
+        if w3 is None:
+            with self.lock:
+                w3 = self.instances.get(network)
+                if w3 is None:
+                    urls = useful_data.Data().constants["networks"][network]["urls"]
+                    w3 = self.instances[network] = Web3(EndpointPool(network, urls))
+
+        return w3
+
+
+web3_registry = Web3Registry()
@@ -0,0 +1,100 @@
+from urllib.parse import urlsplit
+from loguru import logger
+import importlib.util
+import threading
+import httpx
+import time
+
+from .profiling import tracer
+from .metrics import metrics, path_label
+from . import useful_data
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """httpx transport that times every request it sends
+
+    Callers may name the endpoint and method through the "endpoint" and "method" request extensions, otherwise
+    the host and the folded request path are used. The time is measured up to the response headers.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.extensions.get("endpoint") or f"{request.url.scheme}://{request.url.netloc.decode()}"
+        method = request.extensions.get("method") or f"{request.method} {path_label(request.url.path)}"
+
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            metrics.observe(endpoint, method, time.perf_counter() - started, error=True)
+            tracer.record(method, started, category="http", endpoint=endpoint, error=True)
+            raise
+
+        metrics.observe(endpoint, method, time.perf_counter() - started, error=response.status_code >= 400)
+        tracer.record(method, started, category="http", endpoint=endpoint, status=response.status_code)
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class Transport:
+    def __init__(self):
+        self.lock = threading.Lock()
+        # scheme://host -> httpx.Client, each with its own keep-alive connection pool
+        self.clients = {}
+        self.settings = None
+
+    def configure(self, pool_size: int, timeout: float, http2: bool = False):
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+
+        with self.lock:
+            self.settings = {"pool_size": pool_size, "timeout": timeout, "http2": http2}
+
+    def client(self, url: str) -> httpx.Client:
+        parsed = urlsplit(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+
+        client = self.clients.get(host)
+        if client is None:
+            if self.settings is None:
+                data = useful_data.Data()
+                self.configure(data.http_pool_size, data.http_timeout, data.http2)
+
+            with self.lock:
+                client = self.clients.get(host)
+                if client is None:
+                    client = self.clients[host] = httpx.Client(
+                        timeout=self.settings["timeout"],
+                        # Every request of the pool is timed, including those RestClient sends on its own
+                        transport=MeteredTransport(httpx.HTTPTransport(
+                            http2=self.settings["http2"],
+                            limits=httpx.Limits(max_connections=self.settings["pool_size"],
+                                                max_keepalive_connections=self.settings["pool_size"]),
+                        )),
+                    )
+
+        return client
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return self.client(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self.lock:
+            clients, self.clients = self.clients, {}
+
+        for client in clients.values():
+            client.close()
+
+
+transport = Transport()
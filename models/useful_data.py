@@ -1,15 +1,26 @@
 from .utilities import *
 
+# Endpoint URLs that replace the mainnet ones, set by override_endpoints (benchmarks point them at local nodes)
+ENDPOINT_OVERRIDES = {}
+
+
+def override_endpoints(evm: str = None, aptos: str = None, gas_api: str = None):
+    ENDPOINT_OVERRIDES.update({key: url for key, url in (("evm", evm), ("aptos", aptos), ("gas_api", gas_api))
+                               if url is not None})
+
 
 class Data:
     def __init__(self):
-        self.proxy_type, self.accounts_range, self.choice_ratio, self.pause_from, self.pause_to, accounts_list = read_config_values()
+        self.proxy_type, self.accounts_range, self.choice_ratio, self.pause_from, self.pause_to, accounts_list, \
+            self.threads, self.gas_cache_ttl, (self.http_pool_size, self.http_timeout, self.http2), \
+            (self.reserves_interval, self.reserves_max_age), (self.metrics_path, self.metrics_interval) = \
+            read_config_values()
 
         self.constants = self.get_constants()
         self.config = None
 
     def get_constants(self) -> dict:
-        return {
+        return self.apply_overrides({
             "networks": {
                 'Polygon': {
                     'urls': ['https://polygon.llamarpc.com',
@@ -18,6 +29,7 @@ class Data:
                     'symbol': 'MATIC',
                     'tx': "https://polygonscan.com/tx/",
                     'chain_id': 109,
+                    'block_time': 2,
                 },
                 'Avalanche': {
                     'urls': ['https://avalanche.public-rpc.com',
@@ -26,6 +38,7 @@ class Data:
                     'symbol': 'AVAX',
                     'tx': "https://snowtrace.io/tx/",
                     'chain_id': 106,
+                    'block_time': 2,
                 },
             },
             "usdt_contracts": {
@@ -41,6 +54,10 @@ class Data:
                 "Polygon": "0x488863D609F3A673875a914fBeE7508a1DE45eC6",
                 "Avalanche": "0xA5972EeE0C9B5bBb89a5B16D1d65f94c9EF25166",
             },
+            "bridge_gas_limits": {
+                "Polygon": 250000,
+                "Avalanche": 250000,
+            },
             "ERC20_ABI": [
                 {
                     "constant": True,
@@ -50,6 +67,44 @@ class Data:
                     "payable": False,
                     "stateMutability": "view",
                     "type": "function",
+                },
+                {
+                    "constant": True,
+                    "inputs": [{"name": "owner", "type": "address"}, {"name": "spender", "type": "address"}],
+                    "name": "allowance",
+                    "outputs": [{"name": "", "type": "uint256"}],
+                    "payable": False,
+                    "stateMutability": "view",
+                    "type": "function",
+                },
+            ],
+            "multicall3": "0xcA11bde05977b3631167028862bE2a173976CA11",
+            "MULTICALL3_ABI": [
+                {
+                    "inputs": [
+                        {
+                            "components": [
+                                {"name": "target", "type": "address"},
+                                {"name": "allowFailure", "type": "bool"},
+                                {"name": "callData", "type": "bytes"},
+                            ],
+                            "name": "calls",
+                            "type": "tuple[]",
+                        }
+                    ],
+                    "name": "aggregate3",
+                    "outputs": [
+                        {
+                            "components": [
+                                {"name": "success", "type": "bool"},
+                                {"name": "returnData", "type": "bytes"},
+                            ],
+                            "name": "returnData",
+                            "type": "tuple[]",
+                        }
+                    ],
+                    "stateMutability": "payable",
+                    "type": "function",
                 }
             ],
             "aptos": {
@@ -58,10 +113,29 @@ class Data:
                 "APTOS_USDT": "0x1::coin::CoinStore<0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDT>",
                 "APTOS_USDC": "0x1::coin::CoinStore<0xf22bede237a07e121b56d91a491eb7bcdfd1f5907926a9e58338f964a01b17fa::asset::USDC>",
                 "APTOS_NODE_URL": "https://rpc.ankr.com/http/aptos/v1",
+                "CHAIN_ID": 1,
+                "APTOS_NODE_URLS": ["https://rpc.ankr.com/http/aptos/v1",
+                                    "https://fullnode.mainnet.aptoslabs.com/v1"],
             },
             "GAS_API": "4b98374a09e34d62ac73060b33aa74c7",
+            "GAS_API_URL": "https://api.owlracle.info/v4",
+            "LIQUIDSWAP_NODE_URL": "https://fullnode.mainnet.aptoslabs.com/v1",
             "stargate_addresses": {
                 'Polygon': '0x45A01E4e04F14f7A4a6702c74187c5F6222033cd',
                 'Avalanche': '0x45A01E4e04F14f7A4a6702c74187c5F6222033cd',
             },
-        }
+        })
+
+    @staticmethod
+    def apply_overrides(constants: dict) -> dict:
+        if "evm" in ENDPOINT_OVERRIDES:
+            for network in constants["networks"].values():
+                network["urls"] = [ENDPOINT_OVERRIDES["evm"]]
+        if "aptos" in ENDPOINT_OVERRIDES:
+            constants["aptos"]["APTOS_NODE_URL"] = ENDPOINT_OVERRIDES["aptos"]
+            constants["aptos"]["APTOS_NODE_URLS"] = [ENDPOINT_OVERRIDES["aptos"]]
+            constants["LIQUIDSWAP_NODE_URL"] = ENDPOINT_OVERRIDES["aptos"]
+        if "gas_api" in ENDPOINT_OVERRIDES:
+            constants["GAS_API_URL"] = ENDPOINT_OVERRIDES["gas_api"]
+
+        return constants
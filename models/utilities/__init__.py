@@ -1,2 +1,10 @@
 from .reader import *
-from .aptos_lib import *
+
+
+def __getattr__(name: str):
+    # aptos_lib pulls in ecdsa, only mnemonic derivation needs it
+    if name == "PublicKeyUtils":
+        from . import aptos_lib
+        return aptos_lib.PublicKeyUtils
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
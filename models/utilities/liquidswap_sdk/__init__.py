@@ -1 +1,14 @@
-from .client import *
+import importlib
+
+SUBMODULES = ("amm", "cache", "client", "constants", "pools", "reserves")
+
+
+def __getattr__(name: str):
+    # The client pulls in aptos_sdk's RestClient, the caches and reserve snapshots next to it load without it.
+    # Submodule names fall through so `from . import reserves` imports just that module
+    if not name.startswith("__") and name not in SUBMODULES:
+        client = importlib.import_module(f"{__name__}.client")
+        if hasattr(client, name):
+            return getattr(client, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,80 @@
+from typing import NamedTuple
+import numpy as np
+
+from .constants import FEE_SCALE, FEE_PCT
+
+BPS_SCALE = 10000
+# Bounds of the uint64 path: remainders must fit in int64 and quotients in a float64 mantissa
+MAX_DENOMINATOR = 2 ** 61
+MAX_QUOTIENT = 2 ** 52
+
+
+class Quote(NamedTuple):
+    amount_out: np.ndarray
+    # fraction of the spot price lost to the trade size, fees excluded
+    price_impact: np.ndarray
+    min_out: np.ndarray
+
+
+def fits_u64(amounts_in: np.ndarray, reserve_in: np.ndarray, reserve_out: np.ndarray, fee_scale: int) -> bool:
+    if min(int(np.min(values)) for values in (amounts_in, reserve_in, reserve_out)) < 0:
+        raise ValueError("Amounts and reserves must not be negative")
+
+    return ((int(np.max(reserve_in)) + int(np.max(amounts_in))) * fee_scale < MAX_DENOMINATOR
+            and int(np.max(reserve_out)) < MAX_QUOTIENT)
+
+
+def floor_div_u64(a: np.ndarray, b: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """floor(a * b / d) for uint64 arrays even when a * b overflows 64 bits"""
+    quotient = np.floor(a.astype(float) * b.astype(float) / d.astype(float)).astype(np.uint64)
+    signed_d = d.astype(np.int64)
+    # The float estimate is off by at most a couple of units, the exact remainder survives uint64 wraparound
+    for _ in range(3):
+        remainder = (a * b - quotient * d).view(np.int64)
+        quotient = np.where(remainder < 0, quotient - np.uint64(1),
+                            np.where(remainder >= signed_d, quotient + np.uint64(1), quotient))
+
+    return quotient
+
+
+def quote(amounts_in, reserve_in, reserve_out, slippage_bps: int = 50, fee_pct: int = FEE_PCT,
+          fee_scale: int = FEE_SCALE) -> Quote:
+    """Constant product quotes for raw u64 amounts, inputs broadcast against each other (e.g. pools[:, None] x amounts)
+
+    Outputs are floored exactly like the pool's on-chain u128 arithmetic.
+    """
+    amounts_in, reserve_in, reserve_out = np.broadcast_arrays(np.asarray(amounts_in), np.asarray(reserve_in),
+                                                              np.asarray(reserve_out))
+    if amounts_in.size == 0:
+        empty = np.zeros(amounts_in.shape, dtype=np.uint64)
+        return Quote(empty, np.zeros(amounts_in.shape), empty)
+
+    if fits_u64(amounts_in, reserve_in, reserve_out, fee_scale):
+        amounts_in, reserve_in, reserve_out = (values.astype(np.uint64) for values in
+                                               (amounts_in, reserve_in, reserve_out))
+        # NumPy 1.x promotes uint64 * python int to float64, so the scalars need the array type too
+        scalar = np.uint64
+        floor_div = floor_div_u64
+    else:
+        # python integers, as wide as the u128 math on chain
+        amounts_in, reserve_in, reserve_out = (np.vectorize(int, otypes=[object])(values.astype(object)) for values in
+                                               (amounts_in, reserve_in, reserve_out))
+        scalar = int
+        floor_div = lambda a, b, d: a * b // d
+
+    zero = scalar(0)
+    valid = (amounts_in > zero) & (reserve_in > zero) & (reserve_out > zero)
+
+    amount_in_after_fees = amounts_in * scalar(fee_scale - fee_pct)
+    new_reserve_in = np.where(valid, reserve_in * scalar(fee_scale) + amount_in_after_fees, scalar(1))
+    amount_out = np.where(valid, floor_div(amount_in_after_fees, reserve_out, new_reserve_in), zero)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spot_out = amounts_in.astype(float) * reserve_out.astype(float) / reserve_in.astype(float)
+        price_impact = np.where(valid, 1 - amount_out.astype(float) / spot_out * fee_scale / (fee_scale - fee_pct),
+                                0.0)
+
+    min_out = floor_div(amount_out, np.full(amount_out.shape, scalar(BPS_SCALE - slippage_bps), dtype=amount_out.dtype),
+                        np.full(amount_out.shape, scalar(BPS_SCALE), dtype=amount_out.dtype))
+
+    return Quote(amount_out, price_impact, min_out)
@@ -0,0 +1,48 @@
+import threading
+import json
+import os
+
+
+class CoinInfoCache:
+    """Decimals of coin types, they never change once a coin is published"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.decimals = {}
+        self.path = None
+
+    def load(self, path: str):
+        with self.lock:
+            if self.path == path:
+                return
+
+            self.path = path
+            try:
+                with open(path, "r") as f:
+                    self.decimals.update(json.load(f))
+            except (OSError, ValueError):
+                # missing or unreadable, the decimals are fetched again and the file rewritten
+                pass
+
+    def get(self, coin_type: str, fetch) -> int:
+        decimals = self.decimals.get(coin_type)
+        if decimals is None:
+            decimals = int(fetch())
+            with self.lock:
+                self.decimals[coin_type] = decimals
+                self.save()
+
+        return decimals
+
+    def save(self):
+        if self.path is None:
+            return
+
+        # Replace the file in one step so an interrupted write never leaves invalid JSON behind
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.decimals, f, indent=2)
+        os.replace(temporary, self.path)
+
+
+coin_info_cache = CoinInfoCache()
@@ -8,7 +8,17 @@ from aptos_sdk.transactions import (
     TransactionPayload,
 )
 from aptos_sdk.type_tag import StructTag, TypeTag
+import time
 
+try:
+    from aptos_sdk.client import ClientConfig
+except ImportError:
+    # aptos_sdk < 0.5 has no client config
+    ClientConfig = None
+
+from .cache import coin_info_cache
+from .pools import pool_index
+from .reserves import reserves_snapshots, ReservesSnapshot
 from .constants import (
     COIN_INFO,
     NETWORKS_MODULES,
@@ -16,24 +26,38 @@ from .constants import (
     FEE_SCALE,
     FEE_PCT,
     CURVES,
+    CURVE_UNCORRELATED,
 )
 
 
 class LiquidSwapClient(RestClient):
-    def __init__(self, node_url: str, tokens_mapping: dict, account: Account):
-        super().__init__(node_url)
+    def __init__(self, node_url: str, tokens_mapping: dict, account: Account, http_client=None, chain_id=None,
+                 coin_info_path: str = None):
+        if http_client is None or chain_id is None:
+            super().__init__(node_url)
+        else:
+            # Reuse a shared connection pool and skip the chain id request RestClient makes on every instance
+            self.base_url = node_url
+            self.client = http_client
+            self.chain_id = chain_id
+            if ClientConfig is not None:
+                self.client_config = ClientConfig()
 
         self.tokens_mapping = tokens_mapping
 
         self.my_account = account
 
+        if coin_info_path is not None:
+            coin_info_cache.load(coin_info_path)
+        for token in self.tokens_mapping:
+            self.get_coin_info(token)
+
     def get_coin_info(self, token: str) -> int:
         token = self.tokens_mapping[token]
-        data = self.account_resource(
+        return coin_info_cache.get(token, lambda: self.account_resource(
             AccountAddress.from_hex(token.split("::")[0]),
             f"{COIN_INFO}<{token}>",
-        )["data"]
-        return data["decimals"]
+        )["data"]["decimals"])
 
     def convert_to_decimals(self, amount: float, token: str) -> int:
         d = self.get_coin_info(token)
@@ -43,42 +67,88 @@ class LiquidSwapClient(RestClient):
         d = self.get_coin_info(token)
         return float(amount / 10**d)
 
-    def calculate_rates(self, from_token: str, to_token: str, amount: float) -> float:
+    def pool_resource_type(self, coin_x: str, coin_y: str, curve: str) -> str:
+        return f"{NETWORKS_MODULES['LiquidityPool']}::LiquidityPool<{coin_x}, {coin_y}, {curve}>"
+
+    def get_pool_resource(self, resource_type: str):
         try:
-            token_x = from_token
-            token_y = to_token
-            type = f"{NETWORKS_MODULES['LiquidityPool']}::LiquidityPool<{self.tokens_mapping[token_x]}, {self.tokens_mapping[token_y]}, {CURVES}>"
-            data = self.account_resource(
-                AccountAddress.from_hex(RESOURCES_ACCOUNT),
-                f"{NETWORKS_MODULES['LiquidityPool']}::LiquidityPool<{self.tokens_mapping[token_x]}, {self.tokens_mapping[token_y]}, {CURVES}>",
-            )["data"]
-            from_token_reserve = self.pretty_amount(
-                int(data["coin_x_reserve"]["value"]), token_x
-            )
-            to_token_reserve = self.pretty_amount(
-                int(data["coin_y_reserve"]["value"]), token_y
-            )
-        except:
-            token_x = to_token
-            token_y = from_token
-            type = f"{NETWORKS_MODULES['LiquidityPool']}::LiquidityPool<{self.tokens_mapping[token_x]}, {self.tokens_mapping[token_y]}, {CURVES}>"
-            data = self.account_resource(
-                AccountAddress.from_hex(RESOURCES_ACCOUNT),
-                type,
-            )["data"]
-            to_token_reserve = self.pretty_amount(
-                int(data["coin_x_reserve"]["value"]), token_x
-            )
-            from_token_reserve = self.pretty_amount(
-                int(data["coin_y_reserve"]["value"]), token_y
-            )
+            return self.account_resource(AccountAddress.from_hex(RESOURCES_ACCOUNT), resource_type)
+        except Exception:
+            # aptos_sdk 0.5 raises on a missing resource, 0.4 returns None
+            return None
+
+    def resolve_pool(self, from_token: str, to_token: str, curve: str = CURVES) -> tuple:
+        """Pool resource type and whether it stores `to_token` as coin X"""
+        coin_from, coin_to = self.tokens_mapping[from_token], self.tokens_mapping[to_token]
+        resolved = pool_index.get(coin_from, coin_to, curve)
+        if resolved is not None:
+            return resolved
+
+        for resource_type, reversed in ((self.pool_resource_type(coin_from, coin_to, curve), False),
+                                        (self.pool_resource_type(coin_to, coin_from, curve), True)):
+            resource = self.get_pool_resource(resource_type)
+            if resource is not None:
+                pool_index.add(coin_from, coin_to, curve, resource_type, reversed)
+                return resource_type, reversed
+
+        raise ValueError(f"No {curve.split('::')[-1]} pool for {from_token}/{to_token}")
+
+    def read_pool(self, resource_type: str) -> ReservesSnapshot:
+        response = self.client.get(f"{self.base_url}/accounts/{RESOURCES_ACCOUNT}/resource/{resource_type}")
+        if response.status_code >= 400:
+            raise ValueError(f"{resource_type} -> {response.status_code} {response.text}")
+
+        data = response.json()["data"]
+        ledger_timestamp = int(response.headers.get("X-Aptos-Ledger-TimestampUsec", 0)) / 1e6
+        return ReservesSnapshot(
+            (int(data["coin_x_reserve"]["value"]), int(data["coin_y_reserve"]["value"])),
+            int(response.headers.get("X-Aptos-Ledger-Version", 0)),
+            max(0.0, time.time() - ledger_timestamp) if ledger_timestamp else 0.0,
+            time.monotonic(),
+        )
+
+    def get_reserves(self, from_token: str, to_token: str, curve: str = CURVES, max_age: float = None) -> tuple:
+        """Raw (from, to) reserves of the pool from the shared snapshot"""
+        resource_type, reversed = self.resolve_pool(from_token, to_token, curve)
+        reserves = reserves_snapshots.get(resource_type, lambda: self.read_pool(resource_type), max_age).reserves
+
+        return reserves[::-1] if reversed else reserves
 
+    @staticmethod
+    def quote(amount: float, from_token_reserve: float, to_token_reserve: float) -> float:
         coinInAfterFees = amount * (FEE_SCALE - FEE_PCT)
 
         newReservesInSize = from_token_reserve * FEE_SCALE + coinInAfterFees
 
         return coinInAfterFees * to_token_reserve / newReservesInSize
 
+    def calculate_rates_batch(self, from_token: str, to_token: str, amounts: list, curve: str = CURVES,
+                              max_age: float = None) -> list:
+        """Quote every amount against a single snapshot of the pool reserves"""
+        if curve != CURVE_UNCORRELATED:
+            raise ValueError("Only uncorrelated pools can be quoted with the constant product formula")
+
+        from_token_reserve, to_token_reserve = self.get_reserves(from_token, to_token, curve, max_age)
+        from_token_reserve = self.pretty_amount(from_token_reserve, from_token)
+        to_token_reserve = self.pretty_amount(to_token_reserve, to_token)
+
+        return [self.quote(amount, from_token_reserve, to_token_reserve) for amount in amounts]
+
+    def quote_amounts(self, from_token: str, to_token: str, amounts, slippage_bps: int = 50, curve: str = CURVES,
+                      max_age: float = None) -> "amm.Quote":
+        """Exact quotes for raw `from_token` amounts, see amm.quote"""
+        # NumPy loads only for batch quotes
+        from . import amm
+
+        if curve != CURVE_UNCORRELATED:
+            raise ValueError("Only uncorrelated pools can be quoted with the constant product formula")
+
+        from_token_reserve, to_token_reserve = self.get_reserves(from_token, to_token, curve, max_age)
+        return amm.quote(amounts, from_token_reserve, to_token_reserve, slippage_bps)
+
+    def calculate_rates(self, from_token: str, to_token: str, amount: float) -> float:
+        return self.calculate_rates_batch(from_token, to_token, [amount])[0]
+
     def get_token_balance(self, token: str) -> float:
         """get balance of `token`"""
         if self.is_coin_registered(token):
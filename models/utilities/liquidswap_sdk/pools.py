@@ -0,0 +1,22 @@
+import threading
+
+
+class PoolIndex:
+    """Resolved LiquidityPool resource types, the pool stores its coins in sorted order so each pair is looked up once"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # (from coin type, to coin type, curve) -> (resource type, reversed)
+        self.pools = {}
+
+    def get(self, coin_from: str, coin_to: str, curve: str):
+        return self.pools.get((coin_from, coin_to, curve))
+
+    def add(self, coin_from: str, coin_to: str, curve: str, resource_type: str, reversed: bool):
+        with self.lock:
+            self.pools[(coin_from, coin_to, curve)] = (resource_type, reversed)
+            # the opposite direction lives in the same resource with the order flipped
+            self.pools[(coin_to, coin_from, curve)] = (resource_type, not reversed)
+
+
+pool_index = PoolIndex()
@@ -0,0 +1,63 @@
+from typing import NamedTuple
+import threading
+import time
+
+
+class StaleReserves(Exception):
+    pass
+
+
+class ReservesSnapshot(NamedTuple):
+    # (coin X, coin Y) reserves in the pool's own order
+    reserves: tuple
+    ledger_version: int
+    # how far the node was behind the chain when the snapshot was read
+    lag: float
+    fetched_at: float
+
+    def age(self) -> float:
+        """Upper bound on how old the reserves are, in seconds"""
+        return time.monotonic() - self.fetched_at + self.lag
+
+
+class ReservesSnapshots:
+    """Pool reserves shared by every quote, each pool is read at most once per `interval`"""
+
+    def __init__(self, interval: float = 2, max_age: float = 15):
+        self.interval = interval
+        self.max_age = max_age
+
+        self.lock = threading.Lock()
+        self.locks = {}
+        self.snapshots = {}
+
+    def configure(self, interval: float, max_age: float):
+        self.interval = interval
+        self.max_age = max_age
+
+    def pool_lock(self, resource_type: str) -> threading.Lock:
+        with self.lock:
+            return self.locks.setdefault(resource_type, threading.Lock())
+
+    def get(self, resource_type: str, fetch, max_age: float = None) -> ReservesSnapshot:
+        max_age = self.max_age if max_age is None else max_age
+
+        with self.pool_lock(resource_type):
+            snapshot = self.snapshots.get(resource_type)
+            if snapshot is None or time.monotonic() - snapshot.fetched_at > self.interval:
+                try:
+                    fresh = fetch()
+                    # a lagging fallback node must not roll the pool back to an older ledger version
+                    if snapshot is None or fresh.ledger_version >= snapshot.ledger_version:
+                        snapshot = self.snapshots[resource_type] = fresh
+                except Exception:
+                    if snapshot is None:
+                        raise
+
+        if snapshot.age() > max_age:
+            raise StaleReserves(f"Reserves of {resource_type} are {snapshot.age():.1f}s old, limit is {max_age}s")
+
+        return snapshot
+
+
+reserves_snapshots = ReservesSnapshots()
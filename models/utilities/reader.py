@@ -44,6 +44,15 @@ def read_config():
     settings["choice_ratio"] = choice_ratio(config["section_a"]["choice_ratio"])
     accounts_list = str(config['section_a']['Accounts_list']).replace(' ', '')
     settings["Accounts_list"] = [int(account) for account in accounts_list.split(",")]
+    settings["threads"] = int(config['section_a'].get('threads', '1'))
+    settings["gas_cache_ttl"] = float(config['section_a'].get('gas_cache_ttl', '10'))
+    settings["http_pool_size"] = int(config['section_a'].get('http_pool_size', '20'))
+    settings["http_timeout"] = float(config['section_a'].get('http_timeout', '15'))
+    settings["http2"] = config['section_a'].getboolean('http2', False)
+    settings["reserves_interval"] = float(config['section_a'].get('reserves_interval', '2'))
+    settings["reserves_max_age"] = float(config['section_a'].get('reserves_max_age', '15'))
+    settings["metrics_path"] = str(config['section_a'].get('metrics_path', '')).strip()
+    settings["metrics_interval"] = float(config['section_a'].get('metrics_interval', '60'))
 
     return settings
 
@@ -56,7 +65,13 @@ def read_config_values():
     pause_from = config['pause_from']
     pause_to = config['pause_to']
     accounts_list = config['Accounts_list']
-    return proxy_type, accounts_range, choice_ratio, pause_from, pause_to, accounts_list
+    threads = config['threads']
+    gas_cache_ttl = config['gas_cache_ttl']
+    http_settings = config['http_pool_size'], config['http_timeout'], config['http2']
+    reserves_settings = config['reserves_interval'], config['reserves_max_age']
+    metrics_settings = config['metrics_path'], config['metrics_interval']
+    return proxy_type, accounts_range, choice_ratio, pause_from, pause_to, accounts_list, threads, gas_cache_ttl, \
+        http_settings, reserves_settings, metrics_settings
 
 
 def choice_ratio(choice_ratio_str):
@@ -0,0 +1,110 @@
+from typing import NamedTuple, Callable, Any
+from loguru import logger
+import threading
+import time
+
+from .metrics import metrics
+
+
+class Waiter(NamedTuple):
+    callback: Callable
+    # time.monotonic() after which the callback gets None
+    deadline: float
+    # whatever the watcher needs to decide for this waiter
+    context: Any = None
+
+
+class Watcher:
+    """One polling thread for many pending keys, every callback runs once with the result or with None after its
+    timeout
+
+    Subclasses implement `poll(keys)`, which resolves what it finds and returns the seconds until the next poll.
+    """
+
+    # thread name, metrics stage and log prefix
+    name = "watcher"
+
+    def __init__(self):
+        # key -> [Waiter, ...]
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def add(self, key, callback, timeout: float, context=None):
+        with self.lock:
+            self.pending.setdefault(key, []).append(Waiter(callback, time.monotonic() + timeout, context))
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+
+        self.wakeup.set()
+
+    def wait(self, key, *args, **kwargs):
+        """Block until `watch(key, ...)` calls back and return what it got"""
+        done = threading.Event()
+        result = {}
+
+        def callback(value):
+            result["value"] = value
+            done.set()
+
+        self.watch(key, callback, *args, **kwargs)
+        done.wait()
+
+        return result["value"]
+
+    def watch(self, key, callback, *args, **kwargs):
+        raise NotImplementedError
+
+    def poll(self, keys: list) -> float:
+        raise NotImplementedError
+
+    def run(self):
+        metrics.set_stage(self.name)
+        while True:
+            self.wakeup.clear()
+            self.expire()
+
+            with self.lock:
+                keys = list(self.pending)
+            if not keys:
+                self.wakeup.wait()
+                continue
+
+            self.sleep(self.poll(keys))
+
+    def sleep(self, interval: float):
+        time.sleep(interval)
+
+    def waiters(self) -> list:
+        with self.lock:
+            return [waiter for waiters in self.pending.values() for waiter in waiters]
+
+    def expire(self):
+        now = time.monotonic()
+        expired = []
+        with self.lock:
+            for key, waiters in list(self.pending.items()):
+                alive = [waiter for waiter in waiters if waiter.deadline > now]
+                expired += [waiter for waiter in waiters if waiter.deadline <= now]
+                if alive:
+                    self.pending[key] = alive
+                else:
+                    del self.pending[key]
+
+        for waiter in expired:
+            self.notify(waiter.callback, None)
+
+    def resolve(self, key, value):
+        with self.lock:
+            waiters = self.pending.pop(key, [])
+
+        for waiter in waiters:
+            self.notify(waiter.callback, value)
+
+    def notify(self, callback, value):
+        try:
+            callback(value)
+        except Exception as err:
+            logger.exception(f"{self.name} | Callback failed -> {err}")